@@ -0,0 +1,8 @@
+"""
+Benchmarks of the single-resource pipeline runners.
+
+Usage:
+
+python -m benchmarks --widths 10,100 --depths 0,3 --output results.json
+python -m benchmarks --compare results.json
+"""
@@ -0,0 +1,127 @@
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime
+
+from .schemas import (
+    CALLBACK_STYLES,
+    METHODS,
+)
+from .runner import (
+    STAGES,
+    run_cases,
+)
+
+
+STAGE_LABELS = {
+    'setup': 'setup',
+    '_build_input_state': 'input',
+    '_invoke_callbacks': 'callback',
+    '_build_output_state': 'output',
+    '_generate_representation': 'repr',
+}
+
+
+def _split(cast):
+    def _parse(text):
+        return [cast(item) for item in text.split(',') if item]
+    return _parse
+
+
+def _case_key(result):
+    return (
+        result['method'], result['width'], result['depth'], result['style'],
+    )
+
+
+def _format_result(result, baseline=None):
+    line = '{:<7}{:>6}{:>6}  {:<6}{:>10.1f} req/s{:>10.1f} KiB'.format(
+        result['method'], result['width'], result['depth'], result['style'],
+        result['requests_per_sec'], result['peak_kib_per_request'],
+    )
+    line += ''.join(
+        '{:>9.3f}'.format(result['stages_ms'][stage])
+        for stage in STAGES
+    )
+    if baseline:
+        line += '{:>8.2f}x'.format(
+            result['requests_per_sec'] / baseline['requests_per_sec'],
+        )
+    return line
+
+
+def _format_header():
+    header = '{:<7}{:>6}{:>6}  {:<6}{:>16}{:>14}'.format(
+        'method', 'width', 'depth', 'style', 'throughput', 'peak memory',
+    )
+    header += ''.join(
+        '{:>9}'.format(STAGE_LABELS[stage])
+        for stage in STAGES
+    )
+    return header + '  (stage timings in ms)'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Benchmark the single-resource pipeline runners.',
+    )
+    parser.add_argument(
+        '--methods', type=_split(str), default=list(METHODS),
+    )
+    parser.add_argument(
+        '--widths', type=_split(int), default=[10, 100, 1000],
+    )
+    parser.add_argument(
+        '--depths', type=_split(int), default=[0, 1, 3],
+    )
+    parser.add_argument(
+        '--styles', type=_split(str), default=list(CALLBACK_STYLES),
+    )
+    parser.add_argument(
+        '--requests', type=int, default=50,
+        help='number of timed requests per case.',
+    )
+    parser.add_argument(
+        '--output',
+        help='save results to this JSON file.',
+    )
+    parser.add_argument(
+        '--compare',
+        help='JSON file of previous results to compare throughput with.',
+    )
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as fin:
+            baseline = {
+                _case_key(result): result
+                for result in json.load(fin)['results']
+            }
+
+    results = run_cases(
+        args.methods, args.widths, args.depths, args.styles, args.requests,
+    )
+
+    print(_format_header())
+    for result in results:
+        print(_format_result(result, baseline.get(_case_key(result))))
+
+    if args.output:
+        with open(args.output, 'w') as fout:
+            json.dump(
+                {
+                    'created': datetime.now().isoformat(),
+                    'python': sys.version,
+                    'platform': platform.platform(),
+                    'results': results,
+                },
+                fout,
+                indent=2,
+            )
+
+
+if __name__ == '__main__':
+    main()
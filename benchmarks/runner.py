@@ -0,0 +1,212 @@
+"""
+Drives the single-resource pipeline runners and collects measurements.
+"""
+
+import asyncio
+import time
+import tracemalloc
+from collections import defaultdict
+
+from restpf.pipeline.single_resource.get import (
+    GetSingleResourcePipelineRunner,
+)
+from restpf.pipeline.single_resource.post import (
+    PostSingleResourcePipelineRunner,
+)
+from restpf.pipeline.single_resource.patch import (
+    PatchSingleResourcePipelineRunner,
+)
+from restpf.pipeline.single_resource.delete import (
+    DeleteSingleResourcePipelineRunner,
+)
+
+from .schemas import generate_resource
+
+
+SETUP_STAGE = 'setup'
+PIPELINE_STAGES = (
+    '_build_input_state',
+    '_invoke_callbacks',
+    '_build_output_state',
+    '_generate_representation',
+)
+STAGES = (SETUP_STAGE,) + PIPELINE_STAGES
+
+
+def _get_pipeline_state_kwargs(raw_attributes):
+    return {
+        'raw_resource_id': 1,
+    }
+
+
+def _post_pipeline_state_kwargs(raw_attributes):
+    return {
+        'raw_resource_id': None,
+        'raw_attributes': raw_attributes,
+        'raw_relationships': {},
+    }
+
+
+def _patch_pipeline_state_kwargs(raw_attributes):
+    return {
+        'raw_resource_id': 1,
+        'raw_attributes': raw_attributes,
+        'raw_relationships': {},
+    }
+
+
+# method -> (runner class, generator of pipeline state kwargs).
+METHOD2RUNNER = {
+    'get': (
+        GetSingleResourcePipelineRunner,
+        _get_pipeline_state_kwargs,
+    ),
+    'post': (
+        PostSingleResourcePipelineRunner,
+        _post_pipeline_state_kwargs,
+    ),
+    'patch': (
+        PatchSingleResourcePipelineRunner,
+        _patch_pipeline_state_kwargs,
+    ),
+    'delete': (
+        DeleteSingleResourcePipelineRunner,
+        _get_pipeline_state_kwargs,
+    ),
+}
+
+
+def _timed_stage(pipeline_cls, stage, timings):
+    original = getattr(pipeline_cls, stage)
+
+    async def timed(self):
+        start = time.perf_counter()
+        await original(self)
+        timings[stage] += time.perf_counter() - start
+
+    return timed
+
+
+def timed_runner_cls(runner_cls, timings):
+    '''
+    Generate a subclass of `runner_cls` whose pipeline accumulates elapsed
+    seconds of each stage to `timings`.
+    '''
+    pipeline_cls = runner_cls.PIPELINE_CLS
+
+    timed_pipeline_cls = type(
+        'Timed' + pipeline_cls.__name__,
+        (pipeline_cls,),
+        {
+            stage: _timed_stage(pipeline_cls, stage, timings)
+            for stage in PIPELINE_STAGES
+        },
+    )
+    return type(
+        'Timed' + runner_cls.__name__,
+        (runner_cls,),
+        {'PIPELINE_CLS': timed_pipeline_cls},
+    )
+
+
+def prepare_runner(runner_cls, resource):
+    runner = runner_cls()
+    runner.prepare(resource)
+    return runner
+
+
+async def run_request(runner, pipeline_state_kwargs, timings=None):
+    '''
+    Run a request on a prepared runner. Time spent outside the pipeline stages
+    (creating the per-request state) is accumulated as the setup stage.
+    '''
+    if timings is None:
+        return await runner.run(**pipeline_state_kwargs)
+
+    stages_before = sum(timings[stage] for stage in PIPELINE_STAGES)
+    start = time.perf_counter()
+
+    state = await runner.run(**pipeline_state_kwargs)
+
+    elapsed = time.perf_counter() - start
+    stages = sum(timings[stage] for stage in PIPELINE_STAGES) - stages_before
+    timings[SETUP_STAGE] += elapsed - stages
+
+    return state
+
+
+async def _measure_peak_memory(runner, pipeline_state_kwargs, requests):
+    peaks = []
+
+    tracemalloc.start()
+    try:
+        for _ in range(requests):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+
+            await run_request(runner, pipeline_state_kwargs)
+
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - base)
+    finally:
+        tracemalloc.stop()
+
+    return sum(peaks) / len(peaks)
+
+
+async def run_case(method, width, depth, style, requests,
+                   memory_requests=3):
+    resource, raw_attributes = generate_resource(width, depth, style)
+
+    runner_cls, generate_kwargs = METHOD2RUNNER[method]
+    pipeline_state_kwargs = generate_kwargs(raw_attributes)
+
+    timings = defaultdict(float)
+    runner = prepare_runner(runner_cls, resource)
+    timed_runner = prepare_runner(
+        timed_runner_cls(runner_cls, timings), resource,
+    )
+
+    # warm up caches.
+    await run_request(runner, pipeline_state_kwargs)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await run_request(timed_runner, pipeline_state_kwargs, timings)
+    elapsed = time.perf_counter() - start
+
+    peak_bytes = await _measure_peak_memory(
+        runner, pipeline_state_kwargs, memory_requests,
+    )
+
+    return {
+        'method': method,
+        'width': width,
+        'depth': depth,
+        'style': style,
+        'requests': requests,
+        'requests_per_sec': requests / elapsed,
+        'stages_ms': {
+            stage: timings[stage] / requests * 1000
+            for stage in STAGES
+        },
+        'peak_kib_per_request': peak_bytes / 1024,
+    }
+
+
+def run_cases(methods, widths, depths, styles, requests):
+    results = []
+
+    loop = asyncio.new_event_loop()
+    try:
+        for method in methods:
+            for width in widths:
+                for depth in depths:
+                    for style in styles:
+                        results.append(loop.run_until_complete(run_case(
+                            method, width, depth, style, requests,
+                        )))
+    finally:
+        loop.close()
+
+    return results
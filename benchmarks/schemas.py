@@ -0,0 +1,145 @@
+"""
+Generates resources, callbacks and payloads for benchmarking.
+
+A resource of width W has W top-level attributes named attr_<idx>. Each of
+them is a nested attribute of depth D, wrapping Object, Array and Tuple in
+turn around an Integer.
+"""
+
+from restpf.resource.attributes import (
+    Bool,
+    Integer,
+    Float,
+    String,
+    Array,
+    Tuple,
+    Object,
+)
+from restpf.resource.definition import (
+    Attributes,
+    Resource,
+)
+
+
+CALLBACK_STYLES = ('sync', 'async', 'chain')
+METHODS = ('get', 'post', 'patch', 'delete')
+
+# for `chain` style, every CHAIN_LENGTH callbacks are chained by run_after.
+CHAIN_LENGTH = 4
+ARRAY_SIZE = 3
+
+
+def generate_attr(depth):
+    if depth == 0:
+        return Integer()
+
+    element_attr = generate_attr(depth - 1)
+
+    kind = depth % 3
+    if kind == 1:
+        return Object({
+            'child': element_attr,
+            'name': String,
+        })
+    elif kind == 2:
+        return Array(element_attr)
+    else:
+        return Tuple(element_attr, Float)
+
+
+def generate_value(attr):
+    if isinstance(attr, Bool):
+        return True
+    elif isinstance(attr, Integer):
+        return 42
+    elif isinstance(attr, Float):
+        return 4.2
+    elif isinstance(attr, String):
+        return 'restpf'
+    elif isinstance(attr, Array):
+        return [
+            generate_value(attr.element_attr)
+            for _ in range(ARRAY_SIZE)
+        ]
+    elif isinstance(attr, Tuple):
+        return [generate_value(child) for child in attr.bh_children]
+    elif isinstance(attr, Object):
+        return {
+            child.name: generate_value(child)
+            for child in attr.bh_children
+        }
+    else:
+        raise RuntimeError('cannot generate value.')
+
+
+def _make_output_callback(value, style):
+    if style == 'async':
+        async def callback(resource_id):
+            return value
+    else:
+        def callback(resource_id):
+            return value
+    return callback
+
+
+def _make_input_callback(style):
+    if style == 'async':
+        async def callback(state):
+            return state.value
+    else:
+        def callback(state):
+            return state.value
+    return callback
+
+
+def _register_callbacks(resource, method, names, style, make_callback):
+    previous = None
+
+    for idx, name in enumerate(names):
+        registrar = getattr(
+            getattr(resource.attributes, name),
+            method.upper(),
+        )
+        callback = make_callback(name)
+
+        if style == 'chain' and idx % CHAIN_LENGTH:
+            registrar(run_after=previous)(callback)
+        else:
+            registrar(callback)
+
+        previous = callback
+
+
+def generate_resource(width, depth, style):
+    '''
+    return (resource, raw_attributes).
+    '''
+    assert style in CALLBACK_STYLES
+
+    names = [f'attr_{idx}' for idx in range(width)]
+    resource = Resource(
+        'benchmark',
+        Attributes({
+            name: generate_attr(depth)
+            for name in names
+        }),
+    )
+
+    attr_obj = resource.attributes_obj.attr_obj
+    raw_attributes = generate_value(attr_obj)
+
+    _register_callbacks(
+        resource, 'get', names, style,
+        lambda name: _make_output_callback(raw_attributes[name], style),
+    )
+    for method in ('post', 'patch'):
+        _register_callbacks(
+            resource, method, names, style,
+            lambda name: _make_input_callback(style),
+        )
+    _register_callbacks(
+        resource, 'delete', names, style,
+        lambda name: _make_output_callback(None, style),
+    )
+
+    return resource, raw_attributes
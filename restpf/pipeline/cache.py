@@ -0,0 +1,24 @@
+"""
+In-process cache of GET representations.
+
+Shared by the runners of a resource: the GET runner reads and fills the
+cache, while the POST/PATCH/DELETE runners invalidate the entry of the
+resource after a successful run.
+
+Example:
+
+cache = RepresentationCache(maxsize=4096, ttl=60)
+
+for runner in (get_runner, patch_runner, delete_runner):
+    runner.set_representation_cache(cache)
+"""
+
+from restpf.utils.helper_classes import LRUCache
+from restpf.utils.helper_classes import MISSING  # noqa
+
+
+class RepresentationCache(LRUCache):
+
+    '''
+    LRU cache of representations keyed by (resource name, resource id).
+    '''
@@ -0,0 +1,164 @@
+"""
+Encoders of representations to JSON bytes.
+
+orjson or ujson is used if installed, otherwise the stdlib json. All the
+codecs share the same output:
+
+- compact separators, `/` is not escaped.
+- floats in the shortest repr that round-trips, non-finite floats (which are
+  not valid JSON) are encoded as null.
+- non-ASCII characters are written in UTF-8, or escaped as `\\uXXXX` if
+  `ensure_ascii` is set (not supported by orjson).
+
+Streamed representations are formatted by `stream_format` of the codec, hence
+joining the fragments gives the same bytes as `encode`.
+
+Example:
+
+codec = create_codec()
+runner.prepare(resource, representation_generator_options={'codec': codec})
+"""
+
+import json
+
+from restpf.utils.helper_functions import replace_non_finite_floats
+from restpf.resource.attribute_serializers import StreamFormat
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+
+class JSONCodec:
+
+    NAME = None
+    SUPPORTS_ENSURE_ASCII = True
+
+    def __init__(self, ensure_ascii=False):
+        if ensure_ascii and not self.SUPPORTS_ENSURE_ASCII:
+            raise RuntimeError(self.NAME + ' does not support ensure_ascii.')
+        self.ensure_ascii = ensure_ascii
+
+        # for streamers, see attribute_serializers.
+        self.stream_format = StreamFormat(
+            dumps=self.dumps,
+            item_sep=',',
+            key_sep=':',
+        )
+
+    @classmethod
+    def available(cls):
+        return True
+
+    def _encode(self, obj):
+        raise NotImplementedError
+
+    def encode(self, obj):
+        try:
+            return self._encode(obj)
+        except (ValueError, OverflowError):
+            # non-finite floats, rarely happens hence not checked in advance.
+            return self._encode(replace_non_finite_floats(obj))
+
+    def dumps(self, obj):
+        return self.encode(obj).decode()
+
+    def encode_fragments(self, fragments):
+        '''
+        Encode the JSON text fragments of a streamed representation, which
+        are formatted by `stream_format`.
+        '''
+        for fragment in fragments:
+            yield fragment.encode()
+
+    def decode(self, data):
+        raise NotImplementedError
+
+
+class StdlibJSONCodec(JSONCodec):
+
+    NAME = 'json'
+
+    def __init__(self, ensure_ascii=False):
+        super().__init__(ensure_ascii)
+        self._encoder = json.JSONEncoder(
+            ensure_ascii=ensure_ascii,
+            allow_nan=False,
+            separators=(',', ':'),
+        )
+
+    def _encode(self, obj):
+        return self._encoder.encode(obj).encode()
+
+    def decode(self, data):
+        return json.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+
+    NAME = 'ujson'
+
+    @classmethod
+    def available(cls):
+        return ujson is not None
+
+    def _encode(self, obj):
+        # raises OverflowError on non-finite floats.
+        return ujson.dumps(
+            obj,
+            ensure_ascii=self.ensure_ascii,
+            escape_forward_slashes=False,
+            allow_nan=False,
+        ).encode()
+
+    def decode(self, data):
+        return ujson.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+
+    NAME = 'orjson'
+    # always writes UTF-8.
+    SUPPORTS_ENSURE_ASCII = False
+
+    @classmethod
+    def available(cls):
+        return orjson is not None
+
+    def _encode(self, obj):
+        # non-finite floats are encoded as null by orjson.
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def decode(self, data):
+        return orjson.loads(data)
+
+
+# in the order of preference.
+CODEC_CLSES = [OrjsonCodec, UjsonCodec, StdlibJSONCodec]
+
+
+def create_codec(name=None, ensure_ascii=False):
+    '''
+    Create the codec named `name`, or the fastest one available supporting
+    `ensure_ascii`.
+    '''
+    for codec_cls in CODEC_CLSES:
+        if name is not None and codec_cls.NAME != name:
+            continue
+        if not codec_cls.available():
+            continue
+        if ensure_ascii and not codec_cls.SUPPORTS_ENSURE_ASCII:
+            continue
+        return codec_cls(ensure_ascii=ensure_ascii)
+
+    raise RuntimeError('codec not available: ' + str(name))
+
+
+# used where the representation generator has no codec.
+DEFAULT_CODEC = create_codec()
@@ -0,0 +1,49 @@
+"""
+Entity tags of representations.
+"""
+
+import hashlib
+import json
+
+
+def compute_etag(*parts):
+    '''
+    Stable (strong) entity tag of JSON-like `parts`.
+    '''
+    content = json.dumps(
+        parts,
+        sort_keys=True,
+        separators=(',', ':'),
+        default=repr,
+    )
+    return compute_etag_of_bytes(content.encode())
+
+
+def compute_etag_of_bytes(content):
+    '''
+    Strong entity tag of `content`, e.g. an encoded representation.
+    '''
+    return '"{}"'.format(
+        hashlib.blake2b(content, digest_size=16).hexdigest(),
+    )
+
+
+def etag_matches(etag, if_none_match):
+    '''
+    Weak comparison of `etag` against the value of If-None-Match header,
+    which could be `*` or a list of entity tags.
+    '''
+    if etag is None or not if_none_match:
+        return False
+
+    if if_none_match.strip() == '*':
+        return True
+
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+
+    return False
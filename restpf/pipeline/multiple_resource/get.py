@@ -0,0 +1,110 @@
+from restpf.utils.helper_classes import (
+    StateCreator,
+)
+from restpf.pipeline.protocol import (
+    CallbackKwargsStateVariableMapper,
+    ResourceState,
+    PipelineRunner,
+    MultipleResourcePipeline,
+)
+from restpf.pipeline.single_resource.get import (
+    GetSingleResourceContextRule,
+    GetSingleResourceStateTreeBuilder,
+    GetSingleResourceRepresentationGenerator,
+)
+
+
+class GetMultipleResourcePipelineState(metaclass=StateCreator):
+
+    ATTRS = [
+        'raw_resource_ids',
+    ]
+
+
+class GetMultipleResourceCallbackKwargsStateVariableMapper(
+    CallbackKwargsStateVariableMapper
+):
+    ATTR2KWARG = {
+        'raw_resource_ids': 'resource_ids',
+    }
+
+
+class GetMultipleResourceContextRule(GetSingleResourceContextRule):
+    pass
+
+
+class GetMultipleResourceStateTreeBuilder(
+    GetSingleResourceStateTreeBuilder,
+):
+
+    PROXY_ATTRS = [
+        'raw_resource_ids',
+    ]
+
+    def build_input_state(self, resource):
+        # ids are validated on construction.
+        for raw_resource_id in self.raw_resource_ids:
+            self._create_input_state_tree(resource.id_obj, raw_resource_id)
+
+        return ResourceState(
+            attributes=None,
+            relationships=None,
+            resource_id=None,
+        )
+
+
+class GetMultipleResourceRepresentationGenerator(
+    GetSingleResourceRepresentationGenerator,
+):
+
+    PROXY_ATTRS = [
+        'raw_resource_ids',
+    ]
+
+    def generate_representation(self, resource, output_state):
+        return [
+            self._generate_resource_representation(
+                resource, resource_id, raw_obj,
+            )
+            for resource_id, raw_obj in zip(
+                self.raw_resource_ids,
+                self.merged_output_of_callbacks,
+            )
+        ]
+
+    def _stream_resource_representations(self, resource, resource_ids,
+                                         raw_objs, fmt):
+        yield '['
+        for idx, (resource_id, raw_obj) in enumerate(
+            zip(resource_ids, raw_objs),
+        ):
+            if idx:
+                yield fmt.item_sep
+            yield from self._stream_resource_representation(
+                resource, resource_id, raw_obj, fmt,
+            )
+        yield ']'
+
+    def stream_representation(self, resource, output_state):
+        # the proxy state is bound eagerly, since the fragments could be
+        # consumed after the request state is released.
+        return self._stream_resource_representations(
+            resource,
+            self.raw_resource_ids,
+            self.merged_output_of_callbacks,
+            self.stream_format,
+        )
+
+
+class GetMultipleResourcePipelineRunner(PipelineRunner):
+
+    CALLBACK_KWARGS_CONTROLLER_CLSES = [
+        GetMultipleResourceCallbackKwargsStateVariableMapper,
+    ]
+    CONTEXT_RULE_CLS = GetMultipleResourceContextRule
+
+    STATE_TREE_BUILDER_CLS = GetMultipleResourceStateTreeBuilder
+    REPRESENTATION_GENERATOR_CLS = GetMultipleResourceRepresentationGenerator
+
+    PIPELINE_CLS = MultipleResourcePipeline
+    PIPELINE_STATE_CLS = GetMultipleResourcePipelineState
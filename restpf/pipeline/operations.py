@@ -1,10 +1,11 @@
-from collections import deque
-
 from restpf.utils.helper_classes import (
     ProxyStateOperator,
 )
-from restpf.resource.attributes import (
-    AttributeContextOperator,
+from restpf.resource.attribute_schema import (
+    compile_attribute_schema,
+)
+from restpf.resource.attribute_serializers import (
+    DEFAULT_STREAM_FORMAT,
 )
 from restpf.resource.attribute_states import (
     create_attribute_state_tree_for_input,
@@ -29,10 +30,16 @@ class ContextRule:
             self._callback_kwargs_registrar,
         )
 
+    def _validate_state(self, state):
+        schema = compile_attribute_schema(state.bh_node, self.HTTPMethod)
+        if state.validated_schema is schema:
+            # validated on construction.
+            return True
+        return state.validate_schema(schema)
+
     def _default_validator(self, state):
-        context = AttributeContextOperator(self.HTTPMethod)
         return all(map(
-            lambda x: x.validate(context),
+            self._validate_state,
             filter(
                 bool,
                 [
@@ -49,19 +56,22 @@ class ContextRule:
     async def validate_output_state(self, state):
         return self._default_validator(state)
 
-    def _select_callbacks(self, query, root_attr, root_state):
-        queue = deque()
-        queue.append(
-            (root_attr, root_state),
-        )
+    def callback_plan(self, resource):
+        return resource.callback_plan(self.HTTPMethod)
 
+    def _locate_state(self, root_state, path):
+        state = root_state
+        for name in path:
+            state = getattr(state, name) if state else None
+        return state
+
+    def _select_callbacks(self, registered, root_state):
         ret = []
 
-        while queue:
-            attr, state = queue.popleft()
-            callback, options = query(attr.bh_path, self.HTTPMethod)
+        for attr, callback, options in registered:
+            state = self._locate_state(root_state, attr.path)
 
-            if callback and (state or root_state is None):
+            if state or root_state is None:
                 ret.append(
                     (
                         callback,
@@ -74,12 +84,6 @@ class ContextRule:
                     ),
                 )
 
-            for name, child_attr in attr.bh_named_children.items():
-                child_state = getattr(state, name) if state else None
-                queue.append(
-                    (child_attr, child_state),
-                )
-
         return ret
 
     async def select_callbacks(self, resource, state):
@@ -88,18 +92,9 @@ class ContextRule:
         '''
 
         ret = {}
-        for key in ['special_hooks', 'attributes', 'relationships']:
-            if getattr(resource, key) is None:
-                continue
-
-            attr_collection = getattr(resource, f'{key}_obj')
-
+        for key, registered in self.callback_plan(resource).collections:
             ret[key] = self._select_callbacks(
-                getattr(
-                    attr_collection,
-                    'get_registered_callback_and_options',
-                ),
-                getattr(attr_collection, 'attr_obj'),
+                registered,
                 getattr(state, key, None),
             )
 
@@ -108,6 +103,17 @@ class ContextRule:
     def attach_callback_kwargs_controller(self, controller):
         self._callback_kwargs_processor.add_controller(controller)
 
+    def bind_proxy_state(self, state):
+        self._callback_kwargs_registrar.bind_proxy_state(state)
+
+    @property
+    def proxy_state_operators(self):
+        return [
+            controller
+            for controller in self._callback_kwargs_processor.controllers
+            if isinstance(controller, ProxyStateOperator)
+        ]
+
     async def callback_kwargs(self, attr, state):
         return self._callback_kwargs_processor.callback_kwargs(attr, state)
 
@@ -118,8 +124,26 @@ class StateTreeBuilder(ProxyStateOperator):
         'raw_resource_id',
     ]
 
-    def _get_id_state_for_input(self, resource):
+    # if set, input states are validated while being built.
+    HTTPMethod = None
+
+    def __init__(self, lazy=False):
+        # if set, elements of objects in the input states are built on being
+        # reached, see LazyObjectStateForInput.
+        self.lazy = lazy
+
+    def _create_input_state_tree(self, node, value):
+        if self.HTTPMethod is None:
+            schema = None
+        else:
+            schema = compile_attribute_schema(node, self.HTTPMethod)
+
         return create_attribute_state_tree_for_input(
+            node, value, schema, lazy=self.lazy,
+        )
+
+    def _get_id_state_for_input(self, resource):
+        return self._create_input_state_tree(
             resource.id_obj,
             self.raw_resource_id,
         )
@@ -143,5 +167,31 @@ class RepresentationGenerator(ProxyStateOperator):
         'raw_resource_id',
     ]
 
+    def __init__(self, stream=False, codec=None):
+        # if set, the pipeline yields the JSON text of representation in
+        # fragments, see `stream_representation`.
+        self.stream = stream
+        # if set, the representation is also encoded to bytes, see
+        # restpf.pipeline.codecs.
+        self.codec = codec
+
     async def generate_representation(self, resource, output_state):
         return {}
+
+    def stream_representation(self, resource, output_state):
+        raise NotImplementedError
+
+    @property
+    def stream_format(self):
+        # fragments match the output of codec.
+        if self.codec is None:
+            return DEFAULT_STREAM_FORMAT
+        return self.codec.stream_format
+
+    def encode_representation(self, representation):
+        '''
+        Return bytes, or an iterator of bytes if `stream` is set.
+        '''
+        if self.stream:
+            return self.codec.encode_fragments(representation)
+        return self.codec.encode(representation)
@@ -1,6 +1,14 @@
 import asyncio
-from functools import wraps
-from collections import defaultdict
+import collections.abc as abc
+from contextvars import ContextVar
+from functools import (
+    partial,
+    wraps,
+)
+from collections import (
+    ChainMap,
+    defaultdict,
+)
 
 from restpf.utils.helper_classes import (
     ProxyStateOperator,
@@ -8,8 +16,15 @@ from restpf.utils.helper_classes import (
 from restpf.utils.helper_functions import (
     method_named_args,
     async_call,
-    parallel_groups_of_callbacks,
+    compile_callback_invoker,
+    call_pickled,
+    LOOP_DEFAULT_EXECUTOR,
+)
+from restpf.utils.constants import (
+    CallbackRegistrarOptions,
+    HTTPMethodConfig,
 )
+from restpf.resource.attribute_states import AttributeStateValidationError
 from restpf.utils.helper_classes import TreeState
 
 from .states import ResourceState                      # noqa
@@ -22,6 +37,9 @@ from .operations import ContextRule                    # noqa
 from .operations import StateTreeBuilder               # noqa
 from .operations import RepresentationGenerator        # noqa
 
+from .cache import MISSING as CACHE_MISSING
+from .codecs import DEFAULT_CODEC
+
 
 def _meta_build(method):
     METHOD_PREFIX = 'build_'
@@ -52,12 +70,19 @@ class PipelineRunner:
     PIPELINE_CLS = None
     PIPELINE_STATE_CLS = DefaultPipelineState
 
+    callback_scheduler = None
+    callback_executor = None
+    process_executor = None
+    request_timeout = None
+    representation_cache = None
+
     @_meta_build
     def build_pipeline_state(self):
         pass
 
     @_meta_build
     def build_context_rule(self):
+        self.context_rule.bind_proxy_state(self.pipeline_state)
         # attach callback controller.
         for controller_cls in self.CALLBACK_KWARGS_CONTROLLER_CLSES:
             # init and bind to state.
@@ -77,17 +102,106 @@ class PipelineRunner:
     def set_resource(self, resource):
         self.resource = resource
 
-    async def run_pipeline(self):
-        pipeline = self.PIPELINE_CLS(
+    def set_callback_scheduler(self, callback_scheduler):
+        self.callback_scheduler = callback_scheduler
+
+    def set_callback_executor(self, callback_executor):
+        '''
+        Synchronous callbacks are run in `callback_executor` (e.g.
+        ThreadPoolExecutor) unless registered with `executor=False`.
+        '''
+        self.callback_executor = callback_executor
+
+    def set_process_executor(self, process_executor):
+        '''
+        Callbacks registered with `cpu_bound=True` are run in
+        `process_executor` (e.g. ProcessPoolExecutor).
+        '''
+        self.process_executor = process_executor
+
+    def set_request_timeout(self, request_timeout):
+        '''
+        Seconds a request prepared by `prepare` could take, the callbacks
+        still running are cancelled once the deadline is passed.
+        '''
+        self.request_timeout = request_timeout
+
+    def set_representation_cache(self, representation_cache):
+        '''
+        See RepresentationCache, only used by SingleResourcePipeline.
+        '''
+        self.representation_cache = representation_cache
+
+    def _create_pipeline(self):
+        return self.PIPELINE_CLS(
             pipeline_state=self.pipeline_state,
             resource=self.resource,
             context_rule=self.context_rule,
             state_builder=self.state_tree_builder,
             rep_generator=self.representation_generator,
+            callback_scheduler=self.callback_scheduler,
+            callback_executor=self.callback_executor,
+            process_executor=self.process_executor,
+            representation_cache=self.representation_cache,
         )
+
+    async def run_pipeline(self):
+        pipeline = self._create_pipeline()
         await pipeline.run()
         return pipeline
 
+    def prepare(self, resource,
+                state_tree_builder_options=None,
+                representation_generator_options=None):
+        '''
+        Assemble the runner once for `resource`, then call `run` for each
+        request. All the components are bound to a ContextVar holding the
+        state of the current request, hence concurrent `run` calls (in
+        different tasks) are isolated.
+        '''
+        self.pipeline_state = ContextVar('pipeline_state')
+
+        self.build_context_rule()
+        self.build_state_tree_builder(**(state_tree_builder_options or {}))
+        self.build_representation_generator(
+            **(representation_generator_options or {})
+        )
+        self.set_resource(resource)
+
+        self.pipeline = self._create_pipeline()
+        self._proxy_state_operators = self.context_rule.proxy_state_operators
+        self._proxy_state_operators.extend([
+            self.state_tree_builder,
+            self.representation_generator,
+            self.pipeline,
+        ])
+
+    async def run(self, deadline=None, **pipeline_state_kwargs):
+        '''
+        Run the prepared pipeline with a new state built from
+        `pipeline_state_kwargs`, return the state, which holds the
+        `representation` etc.
+
+        `deadline` is in the clock of `loop.time()`, derived from
+        `request_timeout` if not given.
+        '''
+        if deadline is None and self.request_timeout is not None:
+            deadline = \
+                asyncio.get_running_loop().time() + self.request_timeout
+
+        state = self.PIPELINE_STATE_CLS(**pipeline_state_kwargs)
+        state.deadline = deadline
+        for operator in self._proxy_state_operators:
+            operator.init_proxy_state(state)
+
+        token = self.pipeline_state.set(state)
+        try:
+            await self.pipeline.run()
+        finally:
+            self.pipeline_state.reset(token)
+
+        return state
+
 
 def _merge_output_of_callbacks(output_of_callbacks):
 
@@ -114,6 +228,33 @@ def _merge_output_of_callbacks(output_of_callbacks):
     return helper(ret, None, output_of_callbacks)
 
 
+def _merge_name2raw_obj(name2raw_obj):
+    return RawOutputStateContainer(**{
+        name: _merge_output_of_callbacks(tree_state)
+        for name, tree_state in name2raw_obj.items()
+    })
+
+
+COLLECTION_NAME_KEY = '_collection_name'
+# kwarg of resource id, key of memoized callbacks.
+RESOURCE_ID_KWARG = 'resource_id'
+
+
+class InputStateValidationError(RuntimeError):
+
+    '''
+    Raised if the raw input (e.g. the request body) cannot be built into or
+    does not conform to the input state.
+    '''
+
+
+class CallbackTimeoutError(RuntimeError):
+
+    def __init__(self, options):
+        self.path = (options[COLLECTION_NAME_KEY],) + options['attr'].path
+        super().__init__('callback timeout: ' + '.'.join(self.path))
+
+
 class PipelineBase(ProxyStateOperator):
 
     '''
@@ -123,6 +264,10 @@ class PipelineBase(ProxyStateOperator):
     - `context_rule`
     - `state_builder`
     - `output_state_creator`
+    - `callback_scheduler`, optional.
+    - `callback_executor`, optional.
+    - `process_executor`, optional.
+    - `representation_cache`, optional.
 
     Steps of pipeline:
 
@@ -139,6 +284,13 @@ class PipelineBase(ProxyStateOperator):
         'merged_output_of_callbacks',
         'output_state',
         'representation',
+        # `representation` encoded by the codec of `rep_generator`, or by
+        # DEFAULT_CODEC for entity tags and caching.
+        'encoded_representation',
+        # limiter of the request, created by `callback_scheduler`.
+        'callback_limiter',
+        # in the clock of `loop.time()`, no deadline if None.
+        'deadline',
     ]
 
     @method_named_args(
@@ -147,6 +299,10 @@ class PipelineBase(ProxyStateOperator):
         'context_rule',
         'state_builder',
         'rep_generator',
+        'callback_scheduler',
+        'callback_executor',
+        'process_executor',
+        'representation_cache',
     )
     def __init__(self):
         '''
@@ -160,20 +316,32 @@ class PipelineBase(ProxyStateOperator):
         self.rep_generator.bind_proxy_state(self.pipeline_state)
 
     async def _build_input_state(self):
-        self.input_state = await async_call(
-            self.state_builder.build_input_state,
-            self.resource,
-        )
+        try:
+            self.input_state = await async_call(
+                self.state_builder.build_input_state,
+                self.resource,
+            )
+            input_state_is_valid = await async_call(
+                self.context_rule.validate_input_state,
+                self.input_state,
+            )
+        except AttributeStateValidationError:
+            raise
+        except (AssertionError, TypeError, ValueError, KeyError,
+                RuntimeError) as error:
+            # raw input of unexpected shape, e.g. a list for an object.
+            raise InputStateValidationError(
+                'input state not buildable: {!r}'.format(error),
+            ) from error
 
-        input_state_is_valid = await async_call(
-            self.context_rule.validate_input_state,
-            self.input_state,
-        )
         if not input_state_is_valid:
-            raise RuntimeError('TODO: input state not valid')
+            raise InputStateValidationError('input state not valid')
 
-    async def _invoke_callbacks(self):
-        COLLECTION_NAME_KEY = '_collection_name'
+    async def _select_callback_groups(self):
+        '''
+        return [[(callback, options), ...], ...], groups of callbacks
+        selected for this request, in execution order.
+        '''
 
         name2selected = await async_call(
             self.context_rule.select_callbacks,
@@ -181,7 +349,6 @@ class PipelineBase(ProxyStateOperator):
         )
 
         callback2options = {}
-        parallel_groups_of_callbacks_input = []
 
         for collection_name, callback_and_options in name2selected.items():
             for callback, options in callback_and_options:
@@ -190,46 +357,187 @@ class PipelineBase(ProxyStateOperator):
                 # keep mapping.
                 callback2options[callback] = options
 
-                parallel_groups_of_callbacks_input.append(
-                    (callback, options.get('options') or {}),
-                )
+        # the schedule is computed once for all requests, filter out the
+        # callbacks not selected for this request.
+        parallel_groups = self.context_rule.callback_plan(
+            self.resource,
+        ).parallel_groups
+
+        ret = []
+        for callback_group in parallel_groups:
+            callback_group = [
+                (callback, callback2options[callback])
+                for callback in callback_group
+                if callback in callback2options
+            ]
+            if callback_group:
+                ret.append(callback_group)
 
-        name2raw_obj = defaultdict(TreeState)
+        return ret
 
-        for callback_group in parallel_groups_of_callbacks(
-            parallel_groups_of_callbacks_input,
-        ):
-            names = []
-            paths = []
-            async_callbacks = []
+    def _init_callback_limiter(self):
+        self.callback_limiter = (
+            self.callback_scheduler.create_request_limiter()
+            if self.callback_scheduler else None
+        )
+
+    def _select_executor(self, registrar_options):
+        '''
+        The `executor` registration option could be an executor, True for the
+        executor of pipeline (or the default executor of loop), or False to
+        run inline.
+        '''
+        executor = (registrar_options or {}).get(
+            CallbackRegistrarOptions.EXECUTOR.value,
+        )
+
+        if executor is None:
+            return self.callback_executor
+        elif executor is True:
+            return self.callback_executor or LOOP_DEFAULT_EXECUTOR
+        elif executor is False:
+            return None
+        else:
+            return executor
+
+    async def _invoke_in_process(self, callback, invoker, kwargs_source):
+        if self.process_executor is None:
+            raise RuntimeError('process_executor not set.')
+
+        kwargs = invoker.extract_kwargs(kwargs_source)
+        # attr and state are not picklable, pass the path and value instead.
+        if 'attr' in kwargs:
+            kwargs['attr'] = kwargs['attr'].path
+        if kwargs.get('state') is not None:
+            kwargs['state'] = kwargs['state'].value
+
+        if invoker.pickled_func is None:
+            func = partial(callback, **kwargs)
+        else:
+            # pickled on registration.
+            func = partial(call_pickled, invoker.pickled_func, **kwargs)
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self.process_executor, func,
+        )
 
-            for callback in callback_group:
-                options = callback2options[callback]
+    async def _call_callback(self, callback, kwargs_source, options):
+        registrar_options = options['options'] or {}
 
-                kwargs = await async_call(
-                    self.context_rule.callback_kwargs,
-                    **options,
+        cache = registrar_options.get(CallbackRegistrarOptions.CACHE.value)
+        resource_id = kwargs_source.get(RESOURCE_ID_KWARG)
+        if cache is None or resource_id is None:
+            return await self._schedule_callback(
+                callback, kwargs_source, options,
+            )
+
+        # memoized per resource id.
+        key = (callback, resource_id)
+        ret = cache.get(key, CACHE_MISSING)
+        if ret is CACHE_MISSING:
+            invalidations = cache.invalidations
+            ret = await self._schedule_callback(
+                callback, kwargs_source, options,
+            )
+            cache.set(key, ret, invalidations)
+        return ret
+
+    async def _schedule_callback(self, callback, kwargs_source, options):
+        registrar_options = options['options'] or {}
+        invoker = compile_callback_invoker(callback)
+
+        if registrar_options.get(CallbackRegistrarOptions.CPU_BOUND.value):
+            def invoke():
+                return self._invoke_in_process(
+                    callback, invoker, kwargs_source,
+                )
+        else:
+            executor = self._select_executor(registrar_options)
+
+            def invoke():
+                return invoker.invoke(callback, kwargs_source, executor)
+
+        if self.callback_scheduler is not None:
+            invoke_without_scheduler = invoke
+
+            def invoke():
+                return self.callback_scheduler.invoke(
+                    self.callback_limiter,
+                    registrar_options,
+                    invoke_without_scheduler,
                 )
 
-                names.append(options.get(COLLECTION_NAME_KEY))
-                paths.append(options.get('attr').bh_path)
+        timeout = self._callback_timeout(registrar_options)
+        if timeout is None:
+            return await invoke()
+        if timeout <= 0:
+            raise CallbackTimeoutError(options)
 
-                async_callbacks.append(async_call(callback, **kwargs))
+        try:
+            return await asyncio.wait_for(invoke(), timeout)
+        except asyncio.TimeoutError:
+            raise CallbackTimeoutError(options) from None
+
+    def _callback_timeout(self, registrar_options):
+        timeout = registrar_options.get(
+            CallbackRegistrarOptions.TIMEOUT.value,
+        )
+        if self.deadline is not None:
+            remaining = self.deadline - asyncio.get_running_loop().time()
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return timeout
+
+    async def _invoke_callback(self, callback, options):
+        kwargs_source = await async_call(
+            self.context_rule.callback_kwargs,
+            **options,
+        )
+        return await self._call_callback(callback, kwargs_source, options)
+
+    async def _invoke_callback_group(self, callback_group):
+        tasks = [
+            asyncio.ensure_future(self._invoke_callback(callback, options))
+            for callback, options in callback_group
+        ]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            # cancel the callbacks still running on failure.
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def _invoke_callbacks(self):
+        await self._invoke_callback_groups(
+            await self._select_callback_groups(),
+        )
+
+    async def _invoke_callback_groups(self, callback_groups):
+        self._init_callback_limiter()
+        name2raw_obj = defaultdict(TreeState)
 
-            for name, path, ret in zip(
-                names, paths, await asyncio.gather(*async_callbacks),
-            ):
+        for callback_group in callback_groups:
+            rets = await self._invoke_callback_group(callback_group)
+
+            for (_, options), ret in zip(callback_group, rets):
+                name = options[COLLECTION_NAME_KEY]
                 if name == 'special_hooks':
                     # do not capture the return of special_hooks.
                     continue
 
-                name2raw_obj[name].touch(path).value = ret
+                name2raw_obj[name].touch(options['attr'].path).value = ret
 
-        for name, tree_state in name2raw_obj.items():
-            name2raw_obj[name] = _merge_output_of_callbacks(tree_state)
+            if self._stop_after_callback_group(callback_group, rets):
+                break
 
         self.merged_output_of_callbacks = \
-            RawOutputStateContainer(**name2raw_obj)
+            _merge_name2raw_obj(name2raw_obj)
+
+    def _stop_after_callback_group(self, callback_group, rets):
+        '''
+        Return True to skip the rest of callback groups.
+        '''
+        return False
 
     async def _build_output_state(self):
         self.output_state = await async_call(
@@ -245,25 +553,192 @@ class PipelineBase(ProxyStateOperator):
 
     async def _generate_representation(self):
         self.representation = None
+        self.encoded_representation = None
         if self.rep_generator:
+            if self.rep_generator.stream:
+                # iterator of JSON text fragments.
+                generate = self.rep_generator.stream_representation
+            else:
+                generate = self.rep_generator.generate_representation
+
             self.representation = await async_call(
-                self.rep_generator.generate_representation,
+                generate,
                 self.resource, self.output_state,
             )
 
+            if self.rep_generator.codec and self.representation is not None:
+                self.encoded_representation = \
+                    self.rep_generator.encode_representation(
+                        self.representation,
+                    )
+
+    def _load_cached_representation(self):
+        '''
+        Return True if `representation` is loaded from cache, hence the
+        pipeline is skipped.
+        '''
+        return False
+
+    def _update_cached_representation(self):
+        pass
+
     async def run(self):
+        if self._load_cached_representation():
+            return
+
         await self._build_input_state()
         await self._invoke_callbacks()
         await self._build_output_state()
         await self._generate_representation()
 
+        self._update_cached_representation()
+
 
 class SingleResourcePipeline(PipelineBase):
-    pass
+
+    '''
+    With `representation_cache`, a GET pipeline reads and fills the cache
+    keyed by (resource name, resource id), while other methods invalidate the
+    entry after a successful run. Representations are cached encoded, and
+    decoded on hits.
+    '''
+
+    PROXY_ATTRS = [
+        'raw_resource_id',
+        # `invalidations` of cache read on a cache miss.
+        'cache_invalidations',
+    ]
+
+    def _cache_key(self):
+        if self.representation_cache is None or self.raw_resource_id is None:
+            return None
+        return (self.resource.name, self.raw_resource_id)
+
+    def _reads_cache(self):
+        return (
+            self.context_rule.HTTPMethod is HTTPMethodConfig.GET and
+            # the iterator of fragments cannot be reused.
+            not (self.rep_generator and self.rep_generator.stream)
+        )
+
+    def _load_cached_representation(self):
+        key = self._cache_key()
+        if key is None or not self._reads_cache():
+            return False
+
+        cache = self.representation_cache
+        value = cache.get(key, CACHE_MISSING)
+        if value is CACHE_MISSING:
+            self.cache_invalidations = cache.invalidations
+            return False
+
+        self._load_cache_value(value)
+        return True
+
+    def _cache_codec(self):
+        return (self.rep_generator and self.rep_generator.codec) or \
+            DEFAULT_CODEC
+
+    def _dump_cache_value(self):
+        # only bytes are cached, since the representation could be mutated
+        # by the caller.
+        if self.encoded_representation is not None:
+            return self.encoded_representation
+        return self._cache_codec().encode(self.representation)
+
+    def _load_cache_value(self, value):
+        # decoded on every hit, hence never shared between requests.
+        self.representation = self._cache_codec().decode(value)
+        self.encoded_representation = value
+
+    def _update_cached_representation(self):
+        key = self._cache_key()
+        if key is None:
+            return
+
+        if self._reads_cache():
+            self.representation_cache.set(
+                key, self._dump_cache_value(), self.cache_invalidations,
+            )
+        elif self.context_rule.HTTPMethod is not HTTPMethodConfig.GET:
+            self.representation_cache.invalidate(key)
 
 
 class MultipleResourcePipeline(PipelineBase):
-    pass
+
+    '''
+    Pipeline of a batch of resources identified by `raw_resource_ids`.
+
+    A callback accepting `resource_ids` is invoked once for the whole batch,
+    and should return either a mapping from resource id to value, or a
+    sequence of values aligned with `resource_ids`. Other callbacks are
+    invoked once per resource with `resource_id`.
+
+    `merged_output_of_callbacks` is a list of RawOutputStateContainer aligned
+    with `raw_resource_ids`.
+    '''
+
+    PROXY_ATTRS = [
+        'raw_resource_ids',
+    ]
+
+    BATCH_KWARG = 'resource_ids'
+    SINGLE_KWARG = RESOURCE_ID_KWARG
+
+    def _split_batch_output(self, ret):
+        resource_ids = self.raw_resource_ids
+
+        if isinstance(ret, abc.Mapping):
+            return [ret.get(resource_id) for resource_id in resource_ids]
+
+        ret = list(ret)
+        if len(ret) != len(resource_ids):
+            raise RuntimeError('batch output not matched with resource ids.')
+        return ret
+
+    async def _invoke_callback(self, callback, options):
+        kwargs_source = await async_call(
+            self.context_rule.callback_kwargs,
+            **options,
+        )
+        invoker = compile_callback_invoker(callback)
+
+        if self.BATCH_KWARG in invoker.params:
+            ret = await self._call_callback(callback, kwargs_source, options)
+            if options[COLLECTION_NAME_KEY] == 'special_hooks':
+                return None
+            return self._split_batch_output(ret)
+
+        return await asyncio.gather(*(
+            self._call_callback(
+                callback,
+                ChainMap({self.SINGLE_KWARG: resource_id}, kwargs_source),
+                options,
+            )
+            for resource_id in self.raw_resource_ids
+        ))
+
+    async def _invoke_callback_groups(self, callback_groups):
+        self._init_callback_limiter()
+        outputs = [defaultdict(TreeState) for _ in self.raw_resource_ids]
+
+        for callback_group in callback_groups:
+            rets = await self._invoke_callback_group(callback_group)
+
+            for (_, options), batch_ret in zip(callback_group, rets):
+                name = options[COLLECTION_NAME_KEY]
+                if name == 'special_hooks':
+                    # do not capture the return of special_hooks.
+                    continue
+
+                path = options['attr'].path
+                for name2raw_obj, ret in zip(outputs, batch_ret):
+                    name2raw_obj[name].touch(path).value = ret
+
+        self.merged_output_of_callbacks = [
+            _merge_name2raw_obj(name2raw_obj)
+            for name2raw_obj in outputs
+        ]
 
 
 # TODO: relative resource pipeline.
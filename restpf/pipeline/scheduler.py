@@ -0,0 +1,185 @@
+"""
+Limits the number of callbacks running at the same time.
+
+A CallbackScheduler is attached to a pipeline runner. Every callback waits
+for a slot of the request it belongs to (`limit`) and then for a slot of the
+optional `shared_limiter`, which could be shared by all runners of the
+process. Waiting callbacks are started in the order of the `priority` option
+given on registration, then in the order of arrival.
+
+Example:
+
+DB_LIMITER = PriorityLimiter(32)
+
+runner.set_callback_scheduler(
+    CallbackScheduler(limit=8, shared_limiter=DB_LIMITER),
+)
+
+@foo.attributes.bar.GET(priority=CallbackPriorityConfig.HIGH)
+def get_bar(resource_id):
+    ...
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+
+from restpf.utils.constants import (
+    CallbackRegistrarOptions,
+    CallbackPriorityConfig,
+)
+
+
+class QueueMetrics:
+
+    def __init__(self):
+        # number of acquisitions.
+        self.acquired = 0
+        # number of acquisitions that had to wait.
+        self.queued = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, wait_seconds, queued):
+        self.acquired += 1
+        if queued:
+            self.queued += 1
+            self.wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def snapshot(self):
+        return {
+            'acquired': self.acquired,
+            'queued': self.queued,
+            'wait_seconds': self.wait_seconds,
+            'max_wait_seconds': self.max_wait_seconds,
+        }
+
+
+class PriorityLimiter:
+
+    '''
+    Semaphore of `limit` slots, handing released slots to the waiter of the
+    smallest priority.
+    '''
+
+    def __init__(self, limit):
+        if limit < 1:
+            raise RuntimeError('limit should be positive.')
+
+        self.limit = limit
+        self.active = 0
+        self.peak_active = 0
+        self.metrics = QueueMetrics()
+
+        # heap of (priority, seq, future).
+        self._waiters = []
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self):
+        return sum(not future.done() for _, _, future in self._waiters)
+
+    async def acquire(self, priority=CallbackPriorityConfig.NORMAL.value):
+        '''
+        Return True if waited for the slot.
+        '''
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            self.metrics.record(0.0, False)
+            return False
+
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # slot has been handed over, pass it on.
+                self.release()
+            raise
+
+        self.metrics.record(time.perf_counter() - start, True)
+        return True
+
+    def release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # hand over the slot, `active` is unchanged.
+                future.set_result(None)
+                return
+
+        self.active -= 1
+
+    def snapshot(self):
+        ret = self.metrics.snapshot()
+        ret.update({
+            'limit': self.limit,
+            'active': self.active,
+            'peak_active': self.peak_active,
+            'waiting': self.waiting,
+        })
+        return ret
+
+
+def callback_priority(options):
+    priority = (options or {}).get(
+        CallbackRegistrarOptions.PRIORITY.value,
+        CallbackPriorityConfig.NORMAL,
+    )
+    if isinstance(priority, CallbackPriorityConfig):
+        priority = priority.value
+    return priority
+
+
+class CallbackScheduler:
+
+    def __init__(self, limit=None, shared_limiter=None):
+        self.limit = limit
+        self.shared_limiter = shared_limiter
+        # waiting of callbacks on both limiters.
+        self.metrics = QueueMetrics()
+
+    def create_request_limiter(self):
+        if self.limit is None:
+            return None
+        return PriorityLimiter(self.limit)
+
+    async def invoke(self, request_limiter, options, invoke):
+        '''
+        Await `invoke()` once slots are acquired.
+        '''
+        priority = callback_priority(options)
+        limiters = [
+            limiter
+            for limiter in (request_limiter, self.shared_limiter)
+            if limiter is not None
+        ]
+
+        start = time.perf_counter()
+        queued = False
+        acquired = []
+        try:
+            for limiter in limiters:
+                queued |= await limiter.acquire(priority)
+                acquired.append(limiter)
+
+            self.metrics.record(time.perf_counter() - start, queued)
+            return await invoke()
+
+        finally:
+            for limiter in reversed(acquired):
+                limiter.release()
+
+    def snapshot(self):
+        ret = {
+            'callbacks': self.metrics.snapshot(),
+        }
+        if self.shared_limiter is not None:
+            ret['shared'] = self.shared_limiter.snapshot()
+        return ret
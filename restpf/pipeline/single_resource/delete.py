@@ -38,6 +38,8 @@ class DeleteSingleResourceContextRule(ContextRule):
 
 class DeleteSingleResourceStateTreeBuilder(StateTreeBuilder):
 
+    HTTPMethod = HTTPMethodConfig.DELETE
+
     def build_input_state(self, resource):
         return ResourceState(
             attributes=None,
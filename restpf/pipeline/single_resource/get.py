@@ -1,11 +1,15 @@
 from restpf.utils.helper_classes import (
     StateCreator,
 )
+from restpf.utils.constants import (
+    CallbackRegistrarOptions,
+)
 from restpf.resource.attributes import (
     HTTPMethodConfig,
 )
-from restpf.resource.attribute_states import (
-    create_attribute_state_tree_for_output,
+from restpf.resource.attribute_serializers import (
+    compile_attribute_serializer,
+    compile_attribute_streamer,
 )
 
 from restpf.pipeline.protocol import (
@@ -17,12 +21,20 @@ from restpf.pipeline.protocol import (
     PipelineRunner,
     SingleResourcePipeline,
 )
+from restpf.pipeline.etag import (
+    compute_etag,
+    compute_etag_of_bytes,
+    etag_matches,
+)
+from restpf.pipeline.codecs import DEFAULT_CODEC
 
 
 class GetSingleResourcePipelineState(metaclass=StateCreator):
 
     ATTRS = [
         'raw_resource_id',
+        # value of If-None-Match header.
+        'if_none_match',
     ]
 
 
@@ -41,6 +53,8 @@ class GetSingleResourceContextRule(ContextRule):
 
 class GetSingleResourceStateTreeBuilder(StateTreeBuilder):
 
+    HTTPMethod = HTTPMethodConfig.GET
+
     def build_input_state(self, resource):
         return ResourceState(
             attributes=None,
@@ -50,30 +64,187 @@ class GetSingleResourceStateTreeBuilder(StateTreeBuilder):
         )
 
     def build_output_state(self, resource, raw_obj):
+        # output is validated and serialized by the representation generator,
+        # directly from `raw_obj`.
         return ResourceState(
-            attributes=create_attribute_state_tree_for_output(
-                resource.attributes_obj.attr_obj,
-                raw_obj.attributes,
-            ),
-            relationships=create_attribute_state_tree_for_output(
-                resource.relationships_obj.attr_obj,
-                raw_obj.relationships,
-            ),
-            # no need to validate.
+            attributes=None,
+            relationships=None,
             resource_id=None,
         )
 
 
 class GetSingleResourceRepresentationGenerator(RepresentationGenerator):
 
-    def generate_representation(self, resource, output_state):
+    PROXY_ATTRS = [
+        'merged_output_of_callbacks',
+    ]
+
+    HTTPMethod = HTTPMethodConfig.GET
+
+    def _serialize(self, attr_collection, raw_obj):
+        serializer = compile_attribute_serializer(
+            attr_collection.attr_obj, self.HTTPMethod,
+        )
+        return serializer(raw_obj)
+
+    def _generate_resource_representation(self, resource, resource_id,
+                                          raw_obj):
         return {
-            'id': self.raw_resource_id,
+            'id': resource_id,
             'type': resource.name,
-            'attributes': output_state.attributes.serialize(),
-            'relationships': output_state.relationships.serialize(),
+            'attributes': self._serialize(
+                resource.attributes_obj, raw_obj.attributes,
+            ),
+            'relationships': self._serialize(
+                resource.relationships_obj, raw_obj.relationships,
+            ),
         }
 
+    def generate_representation(self, resource, output_state):
+        return self._generate_resource_representation(
+            resource,
+            self.raw_resource_id,
+            self.merged_output_of_callbacks,
+        )
+
+    def _stream(self, attr_collection, raw_obj, fmt):
+        streamer = compile_attribute_streamer(
+            attr_collection.attr_obj, self.HTTPMethod, fmt=fmt,
+        )
+        return streamer(raw_obj)
+
+    def _stream_resource_representation(self, resource, resource_id,
+                                        raw_obj, fmt):
+        # same layout as `_generate_resource_representation`.
+        yield (
+            '{' + fmt.dumps('id') + fmt.key_sep + fmt.dumps(resource_id) +
+            fmt.item_sep + fmt.dumps('type') + fmt.key_sep +
+            fmt.dumps(resource.name) +
+            fmt.item_sep + fmt.dumps('attributes') + fmt.key_sep
+        )
+        yield from self._stream(
+            resource.attributes_obj, raw_obj.attributes, fmt,
+        )
+        yield fmt.item_sep + fmt.dumps('relationships') + fmt.key_sep
+        yield from self._stream(
+            resource.relationships_obj, raw_obj.relationships, fmt,
+        )
+        yield '}'
+
+    def stream_representation(self, resource, output_state):
+        return self._stream_resource_representation(
+            resource,
+            self.raw_resource_id,
+            self.merged_output_of_callbacks,
+            self.stream_format,
+        )
+
+
+class GetSingleResourcePipeline(SingleResourcePipeline):
+
+    '''
+    Conditional GET. `etag` is computed from the version stamp returned by the
+    `special_hooks.version` callback, which is invoked as soon as the
+    callbacks it depends on (e.g. `before_all`) are done. If `etag` matches
+    `if_none_match`, `not_modified` is set and the rest of the pipeline is
+    skipped, leaving `representation` None.
+
+    Without the version hook, `etag` falls back to the hash of the encoded
+    representation, hence all the callbacks are invoked and the full body is
+    built and encoded even if a 304 is answered. In stream mode the body is
+    not available before being sent, so `etag` is only set by the version
+    hook.
+    '''
+
+    PROXY_ATTRS = [
+        'if_none_match',
+        'etag',
+        'not_modified',
+    ]
+
+    def _check_not_modified(self, *parts):
+        self.etag = compute_etag(self.resource.name, self.raw_resource_id,
+                                 *parts)
+        self.not_modified = etag_matches(self.etag, self.if_none_match)
+        return self.not_modified
+
+    @staticmethod
+    def _is_version_callback(options):
+        return bool(
+            (options['options'] or {}).get(
+                CallbackRegistrarOptions.VERSION.value,
+            )
+        )
+
+    async def _invoke_callbacks(self):
+        callback_groups = []
+        for callback_group in await self._select_callback_groups():
+            version_group = [
+                (callback, options)
+                for callback, options in callback_group
+                if self._is_version_callback(options)
+            ]
+            if version_group:
+                # after the groups it depends on (e.g. before_all hooks doing
+                # access checks), before the rest of its own group.
+                callback_groups.append(version_group)
+                callback_group = [
+                    (callback, options)
+                    for callback, options in callback_group
+                    if not self._is_version_callback(options)
+                ]
+            if callback_group:
+                callback_groups.append(callback_group)
+
+        await self._invoke_callback_groups(callback_groups)
+
+    def _stop_after_callback_group(self, callback_group, rets):
+        _, options = callback_group[0]
+        if not self._is_version_callback(options):
+            return False
+        return self._check_not_modified('version', rets)
+
+    async def _build_output_state(self):
+        if not self.not_modified:
+            await super()._build_output_state()
+
+    def _check_encoded_not_modified(self):
+        if self.encoded_representation is None:
+            # the generator has no codec, also reused by the cache.
+            self.encoded_representation = \
+                DEFAULT_CODEC.encode(self.representation)
+
+        self.etag = compute_etag_of_bytes(self.encoded_representation)
+        self.not_modified = etag_matches(self.etag, self.if_none_match)
+        if self.not_modified:
+            self.representation = None
+            self.encoded_representation = None
+
+    async def _generate_representation(self):
+        if self.not_modified:
+            return
+
+        await super()._generate_representation()
+
+        stream = self.rep_generator and self.rep_generator.stream
+        if self.etag is None and not stream and \
+                self.representation is not None:
+            self._check_encoded_not_modified()
+
+    def _dump_cache_value(self):
+        return (super()._dump_cache_value(), self.etag)
+
+    def _load_cache_value(self, value):
+        encoded_representation, self.etag = value
+        self.not_modified = etag_matches(self.etag, self.if_none_match)
+        if not self.not_modified:
+            super()._load_cache_value(encoded_representation)
+
+    def _update_cached_representation(self):
+        # nothing to cache.
+        if not self.not_modified:
+            super()._update_cached_representation()
+
 
 class GetSingleResourcePipelineRunner(PipelineRunner):
 
@@ -85,5 +256,5 @@ class GetSingleResourcePipelineRunner(PipelineRunner):
     STATE_TREE_BUILDER_CLS = GetSingleResourceStateTreeBuilder
     REPRESENTATION_GENERATOR_CLS = GetSingleResourceRepresentationGenerator
 
-    PIPELINE_CLS = SingleResourcePipeline
+    PIPELINE_CLS = GetSingleResourcePipeline
     PIPELINE_STATE_CLS = GetSingleResourcePipelineState
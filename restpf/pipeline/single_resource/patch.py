@@ -39,7 +39,8 @@ class PatchSingleResourceContextRule(ContextRule):
 class PatchSingleResourceStateTreeBuilder(
     PostSingleResourceStateTreeBuilder,
 ):
-    pass
+
+    HTTPMethod = HTTPMethodConfig.PATCH
 
 
 class PatchSingleResourceRepresentationGenerator(RepresentationGenerator):
@@ -4,9 +4,6 @@ from restpf.utils.helper_classes import (
 from restpf.resource.attributes import (
     HTTPMethodConfig,
 )
-from restpf.resource.attribute_states import (
-    create_attribute_state_tree_for_input,
-)
 from restpf.pipeline.protocol import (
     ContextRule,
     CallbackKwargsStateVariableMapper,
@@ -58,13 +55,15 @@ class PostSingleResourceStateTreeBuilder(StateTreeBuilder):
         'raw_relationships',
     ]
 
+    HTTPMethod = HTTPMethodConfig.POST
+
     def build_input_state(self, resource):
         return ResourceState(
-            attributes=create_attribute_state_tree_for_input(
+            attributes=self._create_input_state_tree(
                 resource.attributes_obj.attr_obj,
                 self.raw_attributes,
             ),
-            relationships=create_attribute_state_tree_for_input(
+            relationships=self._create_input_state_tree(
                 resource.relationships_obj.attr_obj,
                 self.raw_relationships,
             ),
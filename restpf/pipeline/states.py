@@ -1,3 +1,5 @@
+import collections.abc as abc
+
 from restpf.utils.helper_classes import (
     StateCreator,
     ProxyStateOperator,
@@ -22,56 +24,151 @@ RawOutputStateContainer = namedtuple_with_default(
 )
 
 
+_MISSING = object()
+
+
+class DefaultPipelineState(metaclass=StateCreator):
+
+    ATTRS = []
+
+
+class CallbackKwargsSource(abc.Mapping):
+
+    '''
+    Read-only mapping of callback kwargs, resolved on lookup. A callback
+    invoker only looks up the names accepted by the callback, so the full
+    kwargs are never built for it.
+    '''
+
+    def __init__(self, base, controllers, lookup=True):
+        self._base = base
+        self._controllers = controllers
+        # if not set, some controller implements only `update`, and the full
+        # kwargs are built on the first lookup.
+        self._lookup = lookup
+        self._kwargs = None
+
+    def get(self, name, default=None):
+        if not self._lookup:
+            if self._kwargs is None:
+                self._kwargs = self.to_dict()
+            return self._kwargs.get(name, default)
+
+        # later controllers override former ones.
+        for controller in reversed(self._controllers):
+            value = controller.lookup_kwarg(name, _MISSING)
+            if value is not _MISSING:
+                return value
+        return self._base.get(name, default)
+
+    def __getitem__(self, name):
+        value = self.get(name, _MISSING)
+        if value is _MISSING:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name):
+        return self.get(name, _MISSING) is not _MISSING
+
+    def to_dict(self):
+        ret = dict(self._base)
+        for controller in self._controllers:
+            controller.update(ret)
+        return ret
+
+    def __iter__(self):
+        return iter(self.to_dict())
+
+    def __len__(self):
+        return len(self.to_dict())
+
+
 class CallbackKwargsProcessor:
 
     def __init__(self):
         self._controllers = []
+        # all the controllers support `lookup_kwarg`.
+        self._lookup = True
 
     def add_controller(self, controller):
         self._controllers.append(controller)
+        self._lookup = self._lookup and hasattr(controller, 'lookup_kwarg')
+
+    @property
+    def controllers(self):
+        return self._controllers
 
     def callback_kwargs(self, attr, state):
-        # from arguments.
-        ret = {
-            'attr': attr,
-            'state': state,
-        }
-        # from controllers.
-        for controller in self._controllers:
-            controller.update(ret)
+        return CallbackKwargsSource(
+            # from arguments.
+            {
+                'attr': attr,
+                'state': state,
+            },
+            # from controllers.
+            self._controllers,
+            self._lookup,
+        )
 
-        return ret
 
+class CallbackKwargsRegistrar(ProxyStateOperator):
+
+    '''
+    Registered kwargs are kept in the pipeline state, a private state is bound
+    until the registrar is bound to the pipeline state.
+    '''
 
-class CallbackKwargsRegistrar:
+    PROXY_ATTRS = [
+        ('registered_callback_kwargs', dict),
+    ]
 
     def __init__(self):
-        self._registered_kwargs = {}
+        self.bind_proxy_state(DefaultPipelineState())
 
     def register(self, name, value):
         assert name.isidentifier()
-        self._registered_kwargs[name] = value
+        self.registered_callback_kwargs[name] = value
 
     def update(self, ret):
         # bind registrar.
         ret['callback_kwargs'] = self
         # bind registered variables.
-        ret.update(self._registered_kwargs)
+        ret.update(self.registered_callback_kwargs)
+
+    def lookup_kwarg(self, name, default):
+        if name == 'callback_kwargs':
+            return self
+        return self.registered_callback_kwargs.get(name, default)
 
 
 class CallbackKwargsStateVariableMapper(ProxyStateOperator):
 
     ATTR2KWARG = {}
 
+    # inversion of ATTR2KWARG.
+    _KWARG2ATTR = {}
+
     @classmethod
     def _get_proxy_attrs(cls):
         return cls.ATTR2KWARG.keys()
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._KWARG2ATTR = {
+            kwarg_name: name
+            for name, kwarg_name in cls.ATTR2KWARG.items()
+        }
+
     def update(self, ret):
-        for name in self.PROXY_ATTRS:
-            kwarg_name = self.ATTR2KWARG[name]
+        for name, kwarg_name in self.ATTR2KWARG.items():
             ret[kwarg_name] = getattr(self, name)
 
+    def lookup_kwarg(self, name, default):
+        attr_name = self._KWARG2ATTR.get(name)
+        if attr_name is None:
+            return default
+        return getattr(self, attr_name)
+
 
 class _CallbackKwargsVariableCollectorPropertyGenerator(type):
 
@@ -111,7 +208,7 @@ class CallbackKwargsVariableCollector(
         # bind registered variables.
         ret.update(self.var_collector)
 
-
-class DefaultPipelineState(metaclass=StateCreator):
-
-    ATTRS = []
+    def lookup_kwarg(self, name, default):
+        if name == 'var_collector':
+            return self
+        return self.var_collector.get(name, default)
@@ -0,0 +1,88 @@
+"""
+Compiles attribute trees into frozen, per-HTTP-method schemas.
+
+A schema node holds everything that validation needs to know about an
+attribute under a given HTTP method. Since attributes never change after the
+resource is defined, each (attribute, method) pair is compiled once and shared
+by all requests.
+"""
+
+from restpf.utils.helper_functions import namedtuple_with_default
+
+from .attributes import (
+    NestedAttribute,
+    AttributeContextOperator,
+    AppearanceConfig,
+    UnknowAttributeConfig,
+)
+
+
+AttributeSchema = namedtuple_with_default(
+    'AttributeSchema',
+    ('node', None),
+    ('nodecls', None),
+    ('method', None),
+    # interned path of names from the root.
+    ('path', ()),
+    # AppearanceConfig of this node.
+    ('appearance', None),
+    # True if a null value passes validation.
+    ('nullable', True),
+    # True if unknown names of an Object should be ignored.
+    ('ignore_unknown', True),
+    # schemas of children, in definition order.
+    ('children', ()),
+    # name -> schema of child.
+    ('named_children', {}),
+    # names of children that must appear.
+    ('required_names', frozenset()),
+)
+
+
+_attribute_schema_cache = {}
+
+
+def _compile_attribute_schema(node, method):
+    attr_context = AttributeContextOperator(method)
+
+    children = tuple(
+        compile_attribute_schema(child, method)
+        for child in node.bh_children
+    )
+    appearance = attr_context.appear(node)
+
+    return AttributeSchema(
+        node=node,
+        nodecls=type(node),
+        method=method,
+        path=node.path,
+        appearance=appearance,
+        nullable=(
+            appearance is not AppearanceConfig.REQUIRE or
+            (isinstance(node, NestedAttribute) and not children)
+        ),
+        ignore_unknown=(
+            attr_context.unknown(node) is UnknowAttributeConfig.IGNORE
+        ),
+        children=children,
+        named_children={
+            child.node.bh_name: child
+            for child in children
+        },
+        required_names=frozenset(
+            child.node.bh_name
+            for child in children
+            if child.appearance is AppearanceConfig.REQUIRE
+        ),
+    )
+
+
+def compile_attribute_schema(node, method):
+    key = (node, method)
+
+    schema = _attribute_schema_cache.get(key)
+    if schema is None:
+        schema = _compile_attribute_schema(node, method)
+        _attribute_schema_cache[key] = schema
+
+    return schema
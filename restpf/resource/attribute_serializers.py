@@ -0,0 +1,470 @@
+"""
+Serializes raw output values with compiled attribute schemas.
+
+A serializer walks the raw value (i.e. the merged output of callbacks) and the
+attribute schema side by side, type-checking the leaves and producing the
+representation in the same walk. The produced representation is identical to
+the one of `create_attribute_state_tree_for_output(...).serialize()`, but no
+state tree is built.
+
+A streamer yields the JSON text of the representation in fragments instead,
+so that large arrays can be sent before being walked completely. Joining the
+fragments gives the same text as `json.dumps` of the representation, except
+that non-finite floats (which are not valid JSON) are encoded as null. The
+text could be customized by a StreamFormat, e.g. to match the output of a
+codec (see restpf.pipeline.codecs).
+"""
+
+import collections.abc as abc
+import json
+from itertools import islice
+
+from restpf.utils.helper_functions import (
+    namedtuple_with_default,
+    replace_non_finite_floats,
+)
+from .attributes import (
+    LeafAttribute,
+    Array,
+    Tuple,
+    Object,
+)
+from .attribute_schema import compile_attribute_schema
+from .attribute_states import (
+    AttributeStateValidationError,
+    node2statecls_default_output,
+)
+
+
+def _check_null(schema):
+    if not schema.nullable:
+        raise AttributeStateValidationError(schema.node)
+
+
+def _compile_leaf_checker(schema, node2statecls):
+    statecls = node2statecls(schema.node)
+    python_type = statecls.PYTHON_TYPE
+
+    def check(value):
+        if value is None:
+            _check_null(schema)
+        elif not isinstance(value, python_type):
+            raise AttributeStateValidationError(schema.node)
+        return value
+
+    return check
+
+
+def _compile_leaf_serializer(schema, node2statecls):
+    attr_type = node2statecls(schema.node).ATTR_TYPE
+    check = _compile_leaf_checker(schema, node2statecls)
+
+    def serialize(value):
+        return {
+            'type': attr_type,
+            'value': check(value),
+        }
+
+    return serialize
+
+
+def _compile_array_serializer(schema, node2statecls):
+    attr_type = node2statecls(schema.node).ATTR_TYPE
+
+    element_schema = schema.children[0]
+    element_attr_type = node2statecls(element_schema.node).ATTR_TYPE
+
+    can_abbr = isinstance(element_schema.node, LeafAttribute)
+    if can_abbr:
+        serialize_element = _compile_leaf_checker(
+            element_schema, node2statecls,
+        )
+    else:
+        serialize_element = _compile_serializer(element_schema, node2statecls)
+
+    def serialize(values):
+        assert isinstance(values, abc.Iterable)
+
+        output_list = [serialize_element(value) for value in values]
+        if not output_list:
+            _check_null(schema)
+
+        ret = {
+            'type': attr_type,
+            'value': output_list,
+        }
+        if can_abbr and output_list:
+            ret['element_type'] = element_attr_type
+
+        return ret
+
+    return serialize
+
+
+def _compile_tuple_serializer(schema, node2statecls):
+    attr_type = node2statecls(schema.node).ATTR_TYPE
+
+    element_schemas = schema.children
+    element_attr_types = [
+        node2statecls(element_schema.node).ATTR_TYPE
+        for element_schema in element_schemas
+    ]
+
+    can_abbr = (
+        bool(element_schemas) and
+        isinstance(element_schemas[0].node, LeafAttribute) and
+        len(set(element_attr_types)) == 1
+    )
+    compile_element = (
+        _compile_leaf_checker if can_abbr else _compile_serializer
+    )
+    element_serializers = [
+        compile_element(element_schema, node2statecls)
+        for element_schema in element_schemas
+    ]
+
+    def serialize(values):
+        assert isinstance(values, abc.Iterable)
+
+        if len(values) != len(element_serializers):
+            raise RuntimeError('tuple values not matched')
+
+        output_list = [
+            serialize_element(value)
+            for serialize_element, value in zip(element_serializers, values)
+        ]
+        if not output_list:
+            _check_null(schema)
+
+        ret = {
+            'type': attr_type,
+            'value': output_list,
+        }
+        if can_abbr:
+            ret['element_type'] = element_attr_types[0]
+
+        return ret
+
+    return serialize
+
+
+def _compile_object_serializer(schema, node2statecls):
+    name2serializer = {
+        name: _compile_serializer(element_schema, node2statecls)
+        for name, element_schema in schema.named_children.items()
+    }
+    required_names = schema.required_names
+    ignore_unknown = schema.ignore_unknown
+
+    def serialize(mapping):
+        assert isinstance(mapping, abc.Mapping)
+
+        if not mapping:
+            _check_null(schema)
+            return {}
+
+        for name in required_names:
+            if name not in mapping:
+                raise AttributeStateValidationError(schema.node)
+
+        ret = {}
+        for name, value in mapping.items():
+            serialize_element = name2serializer.get(name)
+
+            # unknown name.
+            if serialize_element is None:
+                if ignore_unknown:
+                    continue
+                else:
+                    raise AttributeStateValidationError(schema.node)
+
+            ret[name] = serialize_element(value)
+
+        return ret
+
+    return serialize
+
+
+_NODECLS2COMPILER = [
+    (LeafAttribute, _compile_leaf_serializer),
+    (Tuple, _compile_tuple_serializer),
+    (Array, _compile_array_serializer),
+    (Object, _compile_object_serializer),
+]
+
+
+def _compile_serializer(schema, node2statecls):
+    for nodecls, compiler in _NODECLS2COMPILER:
+        if isinstance(schema.node, nodecls):
+            return compiler(schema, node2statecls)
+
+    raise RuntimeError('cannot compile serializer for node.')
+
+
+_attribute_serializer_cache = {}
+
+
+def compile_attribute_serializer(node, method,
+                                 node2statecls=node2statecls_default_output):
+    '''
+    Return a function accepting the raw value of `node` and returning its
+    representation. AttributeStateValidationError is raised if the value is
+    not valid under `method`.
+    '''
+
+    key = (node, method, node2statecls)
+
+    serializer = _attribute_serializer_cache.get(key)
+    if serializer is None:
+        serializer = _compile_serializer(
+            compile_attribute_schema(node, method),
+            node2statecls,
+        )
+        _attribute_serializer_cache[key] = serializer
+
+    return serializer
+
+
+# elements of a primitive array encoded in one fragment.
+STREAM_CHUNK_SIZE = 1024
+
+
+def _dumps(value):
+    try:
+        return json.dumps(value, allow_nan=False)
+    except ValueError:
+        # non-finite floats, rarely happens hence not checked in advance.
+        return json.dumps(replace_non_finite_floats(value))
+
+
+StreamFormat = namedtuple_with_default(
+    'StreamFormat',
+    # JSON-like value -> JSON text.
+    ('dumps', _dumps),
+    ('item_sep', ', '),
+    ('key_sep', ': '),
+)
+
+DEFAULT_STREAM_FORMAT = StreamFormat()
+
+
+def _object_head(fmt, key):
+    # text before the value of the first member `key`.
+    return '{' + fmt.dumps(key) + fmt.key_sep
+
+
+def _member_head(fmt, key):
+    # text before the value of a following member `key`.
+    return fmt.item_sep + fmt.dumps(key) + fmt.key_sep
+
+
+def _compile_leaf_streamer(schema, node2statecls, fmt):
+    serialize = _compile_leaf_serializer(schema, node2statecls)
+    dumps = fmt.dumps
+
+    def stream(value):
+        yield dumps(serialize(value))
+
+    return stream
+
+
+def _compile_array_streamer(schema, node2statecls, fmt):
+    attr_type = node2statecls(schema.node).ATTR_TYPE
+
+    element_schema = schema.children[0]
+    element_attr_type = node2statecls(element_schema.node).ATTR_TYPE
+
+    can_abbr = isinstance(element_schema.node, LeafAttribute)
+    if can_abbr:
+        check_element = _compile_leaf_checker(element_schema, node2statecls)
+    else:
+        stream_element = _compile_streamer(
+            element_schema, node2statecls, fmt,
+        )
+
+    dumps = fmt.dumps
+    item_sep = fmt.item_sep
+    head = (
+        _object_head(fmt, 'type') + dumps(attr_type) +
+        _member_head(fmt, 'value') + '['
+    )
+    tail = (
+        ']' + _member_head(fmt, 'element_type') +
+        dumps(element_attr_type) + '}'
+    )
+
+    def stream_abbr_elements(values):
+        values = iter(values)
+        first = True
+        while True:
+            chunk = [
+                check_element(value)
+                for value in islice(values, STREAM_CHUNK_SIZE)
+            ]
+            if not chunk:
+                break
+            # strip brackets of the encoded list.
+            fragment = dumps(chunk)[1:-1]
+            yield fragment if first else item_sep + fragment
+            first = False
+
+    def stream_nested_elements(values):
+        first = True
+        for value in values:
+            if not first:
+                yield item_sep
+            yield from stream_element(value)
+            first = False
+
+    stream_elements = (
+        stream_abbr_elements if can_abbr else stream_nested_elements
+    )
+
+    def stream(values):
+        assert isinstance(values, abc.Iterable)
+
+        yield head
+
+        empty = True
+        for fragment in stream_elements(values):
+            empty = False
+            yield fragment
+
+        if empty:
+            _check_null(schema)
+        yield tail if can_abbr and not empty else ']}'
+
+    return stream
+
+
+def _compile_tuple_streamer(schema, node2statecls, fmt):
+    # tuples are fixed in size, only nested elements are streamed.
+    if all(
+        isinstance(element_schema.node, LeafAttribute)
+        for element_schema in schema.children
+    ):
+        serialize = _compile_tuple_serializer(schema, node2statecls)
+        dumps = fmt.dumps
+
+        def stream(values):
+            yield dumps(serialize(values))
+
+        return stream
+
+    attr_type = node2statecls(schema.node).ATTR_TYPE
+    element_streamers = [
+        _compile_streamer(element_schema, node2statecls, fmt)
+        for element_schema in schema.children
+    ]
+    item_sep = fmt.item_sep
+    head = (
+        _object_head(fmt, 'type') + fmt.dumps(attr_type) +
+        _member_head(fmt, 'value') + '['
+    )
+
+    def stream(values):
+        assert isinstance(values, abc.Iterable)
+
+        if len(values) != len(element_streamers):
+            raise RuntimeError('tuple values not matched')
+
+        yield head
+        for idx, (stream_element, value) in enumerate(
+            zip(element_streamers, values),
+        ):
+            if idx:
+                yield item_sep
+            yield from stream_element(value)
+        yield ']}'
+
+    return stream
+
+
+def _compile_object_streamer(schema, node2statecls, fmt):
+    name2streamer = {
+        name: _compile_streamer(element_schema, node2statecls, fmt)
+        for name, element_schema in schema.named_children.items()
+    }
+    name2heads = {
+        name: (_object_head(fmt, name), _member_head(fmt, name))
+        for name in schema.named_children
+    }
+    required_names = schema.required_names
+    ignore_unknown = schema.ignore_unknown
+
+    def stream(mapping):
+        assert isinstance(mapping, abc.Mapping)
+
+        if not mapping:
+            _check_null(schema)
+            yield '{}'
+            return
+
+        for name in required_names:
+            if name not in mapping:
+                raise AttributeStateValidationError(schema.node)
+
+        first = True
+        for name, value in mapping.items():
+            stream_element = name2streamer.get(name)
+
+            # unknown name.
+            if stream_element is None:
+                if ignore_unknown:
+                    continue
+                else:
+                    raise AttributeStateValidationError(schema.node)
+
+            object_head, member_head = name2heads[name]
+            yield object_head if first else member_head
+            yield from stream_element(value)
+            first = False
+
+        # all the names are unknown and ignored.
+        yield '{}' if first else '}'
+
+    return stream
+
+
+_NODECLS2STREAMER_COMPILER = [
+    (LeafAttribute, _compile_leaf_streamer),
+    (Tuple, _compile_tuple_streamer),
+    (Array, _compile_array_streamer),
+    (Object, _compile_object_streamer),
+]
+
+
+def _compile_streamer(schema, node2statecls, fmt):
+    for nodecls, compiler in _NODECLS2STREAMER_COMPILER:
+        if isinstance(schema.node, nodecls):
+            return compiler(schema, node2statecls, fmt)
+
+    raise RuntimeError('cannot compile streamer for node.')
+
+
+_attribute_streamer_cache = {}
+
+
+def compile_attribute_streamer(node, method,
+                               node2statecls=node2statecls_default_output,
+                               fmt=DEFAULT_STREAM_FORMAT):
+    '''
+    Return a generator function accepting the raw value of `node` and
+    yielding the JSON text of its representation in fragments, formatted by
+    `fmt`. Since the value is validated while being walked,
+    AttributeStateValidationError may be raised after some fragments have
+    been yielded.
+    '''
+
+    key = (node, method, node2statecls, fmt)
+
+    streamer = _attribute_streamer_cache.get(key)
+    if streamer is None:
+        streamer = _compile_streamer(
+            compile_attribute_schema(node, method),
+            node2statecls,
+            fmt,
+        )
+        _attribute_streamer_cache[key] = streamer
+
+    return streamer
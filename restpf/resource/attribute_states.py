@@ -11,17 +11,30 @@ from .attributes import (
     Array,
     Tuple,
     Object,
-    AppearanceConfig,
-    UnknowAttributeConfig,
 )
+from .attribute_schema import compile_attribute_schema
 from restpf.utils.behavior_tree import (
     BehaviorTreeNodeStateLeaf,
     BehaviorTreeNodeStateNested,
 )
 from restpf.utils.helper_functions import property_with_cache
 
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
 
-def create_attribute_state_tree(node, value, node2statecls):
+
+class AttributeStateValidationError(RuntimeError):
+
+    def __init__(self, node):
+        super().__init__(
+            'attribute state not valid: ' + '.'.join(node.path),
+        )
+        self.node = node
+
+
+def create_attribute_state_tree(node, value, node2statecls, schema=None):
     '''
     1. Attribute classes has nothing to do with side effect, including building
     nodes and consuming input value.
@@ -29,6 +42,9 @@ def create_attribute_state_tree(node, value, node2statecls):
     leading to different behavior for a single structure.
     3. State.init_state should consume the entire input value. Kind of top-down
     parsing structure.
+    4. If `schema` is given, each state is validated right after its
+    construction, and AttributeStateValidationError is raised on the first
+    violation. The tree is built and validated in a single walk.
     '''
 
     statecls = node2statecls(node)
@@ -43,12 +59,18 @@ def create_attribute_state_tree(node, value, node2statecls):
     state.bh_bind_node(node)
 
     # process
-    state.init_state(value, node2statecls)
+    state.init_state(value, node2statecls, schema)
+
+    if schema is not None:
+        # elements have already been validated in init_state.
+        if not state.validate_schema_shallow(schema):
+            raise AttributeStateValidationError(node)
+        state.validated_schema = schema
 
     return state
 
 
-def _check_on_none_value_case(state, attr_context):
+def _check_on_none_value_case(state, schema):
 
     if isinstance(state, LeafAttributeState):
         is_null = state.bh_value is None
@@ -57,18 +79,10 @@ def _check_on_none_value_case(state, attr_context):
     else:
         raise NotImplemented
 
-    this_node_is_not_required = \
-        attr_context.appear(state.bh_node) is not AppearanceConfig.REQUIRE
-
-    there_is_no_defined_child = (
-        isinstance(state, NestedAttributeState) and
-        state.bh_node.bh_children_size == 0
-    )
-
     if is_null:
         return (
             True,
-            there_is_no_defined_child or this_node_is_not_required,
+            schema.nullable,
         )
     else:
         return (
@@ -80,29 +94,51 @@ def _check_on_none_value_case(state, attr_context):
 def nullable_processor(validator):
 
     @wraps(validator)
-    def validator_with_nullable_processing(self, attr_context):
-        can_return, flag = _check_on_none_value_case(self, attr_context)
+    def validator_with_nullable_processing(self, schema):
+        can_return, flag = _check_on_none_value_case(self, schema)
         if can_return:
             return flag
         else:
-            return validator(self, attr_context)
+            return validator(self, schema)
 
     return validator_with_nullable_processing
 
 
+def validate_with_attr_context(state, attr_context):
+    '''
+    Validate `state` against the schema compiled for the context of
+    `attr_context`.
+    '''
+    return state.validate_schema(
+        compile_attribute_schema(state.bh_node, attr_context.context),
+    )
+
+
 class LeafAttributeState(BehaviorTreeNodeStateLeaf):
 
+    # set if the state has been validated on construction.
+    __slots__ = ('validated_schema',)
+
     # require subclass to override.
     ATTR_TYPE = 'none'
     PYTHON_TYPE = None
 
-    def init_state(self, value, node2statecls):
+    def __init__(self):
+        super().__init__()
+        self.validated_schema = None
+
+    def init_state(self, value, node2statecls, schema=None):
         raise NotImplemented
 
+    validate = validate_with_attr_context
+
     @nullable_processor
-    def validate(self, attr_context):
+    def validate_schema(self, schema):
         return isinstance(self.bh_value, self.PYTHON_TYPE)
 
+    def validate_schema_shallow(self, schema):
+        return self.validate_schema(schema)
+
     def serialize(self):
         raise NotImplemented
 
@@ -113,7 +149,9 @@ class LeafAttributeState(BehaviorTreeNodeStateLeaf):
 
 class LeafAttributeOutputState(LeafAttributeState):
 
-    def init_state(self, value, node2statecls):
+    __slots__ = ()
+
+    def init_state(self, value, node2statecls, schema=None):
         self.bh_value = value
 
     def serialize(self):
@@ -129,7 +167,9 @@ class LeafAttributeInputState(LeafAttributeState):
     InputState don't need to implement serialize.
     '''
 
-    def init_state(self, value=None, node2statecls=None):
+    __slots__ = ()
+
+    def init_state(self, value=None, node2statecls=None, schema=None):
         if isinstance(value, abc.Mapping):
             assert value['type'] == self.ATTR_TYPE
             self.bh_value = value['value']
@@ -142,6 +182,13 @@ class LeafAttributeInputState(LeafAttributeState):
 
 class NestedAttributeState(BehaviorTreeNodeStateNested):
 
+    # set if the state has been validated on construction.
+    __slots__ = ('validated_schema',)
+
+    def __init__(self):
+        super().__init__()
+        self.validated_schema = None
+
     @property
     def element_attrs(self):
         return self.bh_node.bh_children
@@ -156,14 +203,14 @@ class NestedAttributeState(BehaviorTreeNodeStateNested):
 
     @property
     def element_named_attrs(self):
-        return self.bh_node._bh_named_children
+        return self.bh_node.bh_named_children
 
     def element_named_attr(self, name):
         return self.bh_node.bh_named_child(name)
 
     @property
     def element_named_attr_states(self):
-        return self._bh_named_children
+        return self.bh_named_children
 
     def element_named_attr_state(self, name):
         return self.bh_named_child(name)
@@ -171,11 +218,22 @@ class NestedAttributeState(BehaviorTreeNodeStateNested):
     def element_remove_named_attr_state(self, name):
         self.bh_remove_named_child(name)
 
-    def init_state(self, value, node2statecls):
+    def init_state(self, value, node2statecls, schema=None):
         pass
 
+    validate = validate_with_attr_context
+
+    def validate_schema(self, schema):
+        raise NotImplementedError
+
+    @nullable_processor
+    def validate_schema_shallow(self, schema):
+        return True
+
 
 class BoolStateConfig:
+    __slots__ = ()
+
     BH_NODECLS = Bool
 
     ATTR_TYPE = 'bool'
@@ -183,14 +241,16 @@ class BoolStateConfig:
 
 
 class BoolStateForOutputDefault(BoolStateConfig, LeafAttributeOutputState):
-    pass
+    __slots__ = ()
 
 
 class BoolStateForInputDefault(BoolStateConfig, LeafAttributeInputState):
-    pass
+    __slots__ = ()
 
 
 class IntegerStateConfig:
+    __slots__ = ()
+
     BH_NODECLS = Integer
 
     ATTR_TYPE = 'integer'
@@ -199,15 +259,17 @@ class IntegerStateConfig:
 
 class IntegerStateForOutputDefault(IntegerStateConfig,
                                    LeafAttributeOutputState):
-    pass
+    __slots__ = ()
 
 
 class IntegerStateForInputDefault(IntegerStateConfig,
                                   LeafAttributeInputState):
-    pass
+    __slots__ = ()
 
 
 class FloatStateConfig:
+    __slots__ = ()
+
     BH_NODECLS = Float
 
     ATTR_TYPE = 'float'
@@ -215,14 +277,16 @@ class FloatStateConfig:
 
 
 class FloatStateForOutputDefault(FloatStateConfig, LeafAttributeOutputState):
-    pass
+    __slots__ = ()
 
 
 class FloatStateForInputDefault(FloatStateConfig, LeafAttributeInputState):
-    pass
+    __slots__ = ()
 
 
 class StringStateConfig:
+    __slots__ = ()
+
     BH_NODECLS = String
 
     ATTR_TYPE = 'string'
@@ -230,14 +294,16 @@ class StringStateConfig:
 
 
 class StringStateForOutputDefault(StringStateConfig, LeafAttributeOutputState):
-    pass
+    __slots__ = ()
 
 
 class StringStateForInputDefault(StringStateConfig, LeafAttributeInputState):
-    pass
+    __slots__ = ()
 
 
 class PrimitiveArrayStateConfig:
+    __slots__ = ()
+
     BH_NODECLS = PrimitiveArray
 
     ATTR_TYPE = 'primitive_array'
@@ -246,15 +312,17 @@ class PrimitiveArrayStateConfig:
 
 class PrimitiveArrayStateForOutputDefault(PrimitiveArrayStateConfig,
                                           LeafAttributeOutputState):
-    pass
+    __slots__ = ()
 
 
 class PrimitiveArrayStateForInputDefault(PrimitiveArrayStateConfig,
                                          LeafAttributeInputState):
-    pass
+    __slots__ = ()
 
 
 class PrimitiveObjectStateConfig:
+    __slots__ = ()
+
     BH_NODECLS = PrimitiveObject
 
     ATTR_TYPE = 'primitive_object'
@@ -263,15 +331,17 @@ class PrimitiveObjectStateConfig:
 
 class PrimitiveObjectStateForOutputDefault(PrimitiveArrayStateConfig,
                                            LeafAttributeOutputState):
-    pass
+    __slots__ = ()
 
 
 class PrimitiveObjectStateForInputDefault(PrimitiveObjectStateConfig,
                                           LeafAttributeInputState):
-    pass
+    __slots__ = ()
 
 
 class ArrayStateConfig:
+    __slots__ = ()
+
     BH_NODECLS = Array
 
     ATTR_TYPE = 'array'
@@ -279,6 +349,8 @@ class ArrayStateConfig:
 
 class ArrayStateCommon(ArrayStateConfig, NestedAttributeState):
 
+    __slots__ = ()
+
     def __getitem__(self, key):
         if isinstance(key, (int, slice)):
             return self.bh_child(key)
@@ -313,10 +385,11 @@ class ArrayStateCommon(ArrayStateConfig, NestedAttributeState):
         else:
             return not isinstance(self.bh_child(), NestedAttributeState)
 
-    def init_state_for_list(self, values, node2statecls):
+    def init_state_for_list(self, values, node2statecls, schema=None):
         assert isinstance(values, abc.Iterable)
 
         element_attr = self.element_attr()
+        element_schema = None if schema is None else schema.children[0]
 
         # recursive construction.
         for element_value in values:
@@ -324,16 +397,19 @@ class ArrayStateCommon(ArrayStateConfig, NestedAttributeState):
                 element_attr,
                 element_value,
                 node2statecls,
+                element_schema,
             )
             self.bh_add_child(element_state)
 
     @nullable_processor
-    def validate(self, attr_context):
-        element_attrcls = self.element_attrcls()
+    def validate_schema(self, schema):
+        element_schema = schema.children[0]
+        element_attrcls = element_schema.nodecls
+
         for element_state in self.element_attr_states:
             if element_state.bh_nodecls is not element_attrcls:
                 return False
-            if not element_state.validate(attr_context):
+            if not element_state.validate_schema(element_schema):
                 return False
 
         return True
@@ -341,8 +417,10 @@ class ArrayStateCommon(ArrayStateConfig, NestedAttributeState):
 
 class ArrayStateForOutputDefault(ArrayStateCommon):
 
-    def init_state(self, values, node2statecls):
-        self.init_state_for_list(values, node2statecls)
+    __slots__ = ()
+
+    def init_state(self, values, node2statecls, schema=None):
+        self.init_state_for_list(values, node2statecls, schema)
 
     def serialize(self):
         output_list = []
@@ -368,24 +446,156 @@ class ArrayStateForOutputDefault(ArrayStateCommon):
         return ret
 
 
+# numpy.dtype.kind accepted for the PYTHON_TYPE of elements.
+_PYTHON_TYPE2DTYPE_KINDS = {
+    bool: 'b',
+    int: 'iu',
+    float: 'f',
+    str: 'U',
+}
+
+
+def _is_ndarray(values):
+    return numpy is not None and isinstance(values, numpy.ndarray)
+
+
+def validate_primitive_values(values, python_type, nullable, valueclses=None):
+    '''
+    Check all elements of `values` in one pass, equivalent to validating the
+    leaf states of elements one by one. `valueclses`, the set of types of
+    elements, is collected from `values` if not given.
+    '''
+    if _is_ndarray(values):
+        return (
+            values.ndim == 1 and
+            values.dtype.kind in _PYTHON_TYPE2DTYPE_KINDS[python_type]
+        )
+
+    if valueclses is None:
+        valueclses = set(map(type, values))
+
+    for valuecls in valueclses:
+        if valuecls is type(None):
+            if not nullable:
+                return False
+        elif not issubclass(valuecls, python_type):
+            return False
+    return True
+
+
 class ArrayStateForInputDefault(ArrayStateCommon):
 
-    def init_state(self, values, node2statecls):
+    '''
+    An array of Bool/Integer/Float/String is kept packed as the raw list (or
+    numpy.ndarray) and validated in one pass. States of elements are only
+    created on accessing the children.
+    '''
+
+    # no __slots__, __dict__ is required by property_with_cache.
+
+    PACKED_ELEMENT_STATECLSES = (
+        BoolStateForInputDefault,
+        IntegerStateForInputDefault,
+        FloatStateForInputDefault,
+        StringStateForInputDefault,
+    )
+
+    _packed_values = None
+    _packed_valueclses = None
+    _packed_node2statecls = None
+
+    def init_state(self, values, node2statecls, schema=None):
         if isinstance(values, abc.Mapping):
             assert values['type'] == self.ATTR_TYPE
-            self.init_state_for_list(values['value'], node2statecls)
+            self.init_state_for_list(values['value'], node2statecls, schema)
         else:
-            self.init_state_for_list(values, node2statecls)
+            self.init_state_for_list(values, node2statecls, schema)
+
+    def init_state_for_list(self, values, node2statecls, schema=None):
+        element_statecls = node2statecls(self.element_attr())
+
+        valueclses = None
+        if element_statecls in self.PACKED_ELEMENT_STATECLSES:
+            if isinstance(values, list):
+                valueclses = set(map(type, values))
+                # elements in the form of {'type': ..., 'value': ...}.
+                if any(issubclass(c, abc.Mapping) for c in valueclses):
+                    valueclses = None
+            elif _is_ndarray(values):
+                valueclses = ()
+
+        if valueclses is None:
+            super().init_state_for_list(values, node2statecls, schema)
+            return
+
+        self._packed_values = values
+        self._packed_valueclses = valueclses
+        self._packed_node2statecls = node2statecls
+
+        if schema is not None:
+            element_schema = schema.children[0]
+            if not self._validate_packed_values(element_schema):
+                raise AttributeStateValidationError(element_schema.node)
+
+    def _validate_packed_values(self, element_schema):
+        return validate_primitive_values(
+            self._packed_values,
+            self._packed_node2statecls(element_schema.node).PYTHON_TYPE,
+            element_schema.nullable,
+            self._packed_valueclses,
+        )
+
+    def _unpack(self):
+        values = self._packed_values
+        self._packed_values = None
+
+        if _is_ndarray(values):
+            values = values.tolist()
+        super().init_state_for_list(values, self._packed_node2statecls)
+
+    @property
+    def bh_children(self):
+        if self._packed_values is not None:
+            self._unpack()
+        return super().bh_children
+
+    @property
+    def bh_named_children(self):
+        if self._packed_values is not None:
+            self._unpack()
+        return super().bh_named_children
+
+    @property
+    def bh_children_size(self):
+        if self._packed_values is not None:
+            return len(self._packed_values)
+        return super().bh_children_size
+
+    def validate_schema(self, schema):
+        if self._packed_values is None:
+            return super().validate_schema(schema)
+
+        if not len(self._packed_values):
+            return schema.nullable
+        return self._validate_packed_values(schema.children[0])
 
     def serialize(self):
         return None
 
     @property_with_cache
     def value(self):
-        return list(child.value for child in self)
+        values = self._packed_values
+        if values is None:
+            return list(child.value for child in self)
+        elif _is_ndarray(values):
+            return values.tolist()
+        else:
+            return list(values)
 
 
 class TupleStateConfig:
+    __slots__ = ()
+
     BH_NODECLS = Tuple
 
     ATTR_TYPE = 'tuple'
@@ -393,6 +603,8 @@ class TupleStateConfig:
 
 class TupleStateCommon(TupleStateConfig):
 
+    __slots__ = ()
+
     def can_abbr(self):
         if self.bh_children_size == 0:
             return False
@@ -407,34 +619,41 @@ class TupleStateCommon(TupleStateConfig):
     def element_attr_name(self, idx):
         return self.bh_node.element_attr_name(idx)
 
-    def init_state_for_list(self, values, node2statecls):
+    def init_state_for_list(self, values, node2statecls, schema=None):
         assert isinstance(values, abc.Iterable)
 
         if len(values) != self.element_attr_size:
             raise RuntimeError('tuple values not matched')
 
+        element_schemas = (
+            [None] * len(values) if schema is None else schema.children
+        )
+
         # recursive construction.
-        for element_attr, element_value in zip(self.element_attrs, values):
+        for element_attr, element_schema, element_value in zip(
+            self.element_attrs, element_schemas, values,
+        ):
             element_state = create_attribute_state_tree(
                 element_attr,
                 element_value,
                 node2statecls,
+                element_schema,
             )
             self.bh_add_child(element_state)
 
     @nullable_processor
-    def validate(self, attr_context):
+    def validate_schema(self, schema):
+        element_schemas = schema.children
 
-        if len(self.element_attrs) != len(self.element_attr_states):
+        if len(element_schemas) != len(self.element_attr_states):
             return False
 
-        for idx, element_state in enumerate(self.element_attr_states):
-            element_attr = self.bh_relative_nodecls(
-                self.element_attr_name(idx),
-            )
-            if element_state.bh_nodecls is not element_attr:
+        for element_schema, element_state in zip(
+            element_schemas, self.element_attr_states,
+        ):
+            if element_state.bh_nodecls is not element_schema.nodecls:
                 return False
-            if not element_state.validate(attr_context):
+            if not element_state.validate_schema(element_schema):
                 return False
 
         return True
@@ -442,8 +661,10 @@ class TupleStateCommon(TupleStateConfig):
 
 class TupleStateForOutputDefault(TupleStateCommon, ArrayStateForOutputDefault):
 
-    def init_state(self, values, node2statecls):
-        self.init_state_for_list(values, node2statecls)
+    __slots__ = ()
+
+    def init_state(self, values, node2statecls, schema=None):
+        self.init_state_for_list(values, node2statecls, schema)
 
 
 class TupleStateForInputDefault(TupleStateCommon, ArrayStateForInputDefault):
@@ -462,6 +683,8 @@ class TupleStateForInputDefault(TupleStateCommon, ArrayStateForInputDefault):
 
 
 class ObjectStateConfig:
+    __slots__ = ()
+
     BH_NODECLS = Object
 
     ATTR_TYPE = 'object'
@@ -469,6 +692,8 @@ class ObjectStateConfig:
 
 class UnknownStatePlaceholderForObject(LeafAttributeState):
 
+    __slots__ = ()
+
     def __init__(self, name, value):
         super().__init__()
         self.bh_rename(name)
@@ -477,9 +702,16 @@ class UnknownStatePlaceholderForObject(LeafAttributeState):
 
 class ObjectStateCommon(ObjectStateConfig, NestedAttributeState):
 
-    def init_state(self, mapping, node2statecls):
+    __slots__ = ()
+
+    def init_state(self, mapping, node2statecls, schema=None):
         assert isinstance(mapping, abc.Mapping)
 
+        # reject the mapping before building any element.
+        if schema is not None and mapping and \
+                not self._validate_element_names(schema, mapping):
+            raise AttributeStateValidationError(self.bh_node)
+
         # recursive construction.
         for element_name, element_value in mapping.items():
             element_attr = self.element_named_attr(element_name)
@@ -489,6 +721,8 @@ class ObjectStateCommon(ObjectStateConfig, NestedAttributeState):
                     element_attr,
                     element_value,
                     node2statecls,
+                    None if schema is None
+                    else schema.named_children[element_name],
                 )
             else:
                 element_state = UnknownStatePlaceholderForObject(
@@ -497,38 +731,39 @@ class ObjectStateCommon(ObjectStateConfig, NestedAttributeState):
 
             self.bh_add_child(element_state)
 
-    @nullable_processor
-    def validate(self, attr_context):
-        can_ignore_unknown = (
-            attr_context.unknown(self.bh_node)
-            is UnknowAttributeConfig.IGNORE
-        )
-
-        all_attr_names = set(self.element_named_attrs)
-        all_state_names = set(self.element_named_attr_states)
-
+    @staticmethod
+    def _validate_element_names(schema, names):
         # for missing keys.
-        for name in (all_attr_names - all_state_names):
-            attr = self.element_named_attr(name)
-            if attr_context.appear(attr) is AppearanceConfig.REQUIRE:
+        for name in schema.required_names:
+            if name not in names:
                 return False
 
-        for name in all_state_names:
-            element_state = self.element_named_attr_state(name)
-
-            # process unknown name.
-            if isinstance(element_state, UnknownStatePlaceholderForObject):
-                # conditional raise.
-                if can_ignore_unknown:
-                    continue
-                else:
+        # for unknown keys.
+        if not schema.ignore_unknown:
+            for name in names:
+                if name not in schema.named_children:
                     return False
 
-            element_attr = self.bh_relative_nodecls(name)
+        return True
+
+    @nullable_processor
+    def validate_schema(self, schema):
+        named_schemas = schema.named_children
+        named_states = self.element_named_attr_states
+
+        if not self._validate_element_names(schema, named_states):
+            return False
 
-            if element_state.bh_nodecls is not element_attr:
+        for name, element_state in named_states.items():
+            element_schema = named_schemas.get(name)
+
+            # ignore unknown name.
+            if element_schema is None:
+                continue
+
+            if element_state.bh_nodecls is not element_schema.nodecls:
                 return False
-            if not element_state.validate(attr_context):
+            if not element_state.validate_schema(element_schema):
                 return False
 
         return True
@@ -550,6 +785,8 @@ class ObjectStateCommon(ObjectStateConfig, NestedAttributeState):
 
 class ObjectStateForOutputDefault(ObjectStateCommon):
 
+    __slots__ = ()
+
     def serialize(self):
         ret = {}
         for name, element_state in self.element_named_attr_states.items():
@@ -566,6 +803,8 @@ class ObjectStateForInputDefault(ObjectStateCommon):
     '''
     Both ObjectStateForInputDefault and ObjectStateForOutputDefault should use
     the same way to construct the state.
+
+    No __slots__, __dict__ is required by property_with_cache.
     '''
 
     def serialize(self):
@@ -579,6 +818,110 @@ class ObjectStateForInputDefault(ObjectStateCommon):
         }
 
 
+class LazyObjectStateForInput(ObjectStateForInputDefault):
+
+    '''
+    Keep the input mapping and build the state of an element only when the
+    element is reached, e.g. by `getattr` or `bh_named_child`. Accessing all
+    the children (`value`, `validate_schema`, iteration...) builds all the
+    remaining elements.
+
+    If built with a schema, names are checked on construction while each
+    element is validated on being built, hence AttributeStateValidationError
+    could be raised on accessing an element. Elements never reached are not
+    validated.
+    '''
+
+    # mapping of elements not built yet, None if all elements are built.
+    _lazy_mapping = None
+    _lazy_node2statecls = None
+    _lazy_schema = None
+
+    def init_state(self, mapping, node2statecls, schema=None):
+        assert isinstance(mapping, abc.Mapping)
+
+        if schema is not None and mapping and \
+                not self._validate_element_names(schema, mapping):
+            raise AttributeStateValidationError(self.bh_node)
+
+        if mapping:
+            self._lazy_mapping = mapping
+            self._lazy_node2statecls = node2statecls
+            self._lazy_schema = schema
+
+    def _build_element(self, name):
+        element_value = self._lazy_mapping[name]
+        element_attr = self.element_named_attr(name)
+
+        if element_attr:
+            schema = self._lazy_schema
+            element_state = create_attribute_state_tree(
+                element_attr,
+                element_value,
+                self._lazy_node2statecls,
+                None if schema is None else schema.named_children[name],
+            )
+        else:
+            element_state = UnknownStatePlaceholderForObject(
+                name, element_value,
+            )
+
+        self.bh_add_child(element_state)
+        return element_state
+
+    def _build_all_elements(self):
+        mapping = self._lazy_mapping
+        built = super().bh_named_children
+
+        children = []
+        for name in mapping:
+            # built elements could be falsy, e.g. an empty array.
+            child = built.get(name)
+            if child is None:
+                child = self._build_element(name)
+            children.append(child)
+        # keep the order of mapping.
+        self._bh_children = children
+        self._bh_named_children = {
+            child.bh_name: child
+            for child in children
+        }
+
+        self._lazy_mapping = None
+
+    def bh_named_child(self, name):
+        child = super().bh_named_children.get(name)
+
+        if child is None and \
+                self._lazy_mapping is not None and name in self._lazy_mapping:
+            child = self._build_element(name)
+
+        return child
+
+    @property
+    def bh_children(self):
+        if self._lazy_mapping is not None:
+            self._build_all_elements()
+        return super().bh_children
+
+    @property
+    def bh_named_children(self):
+        if self._lazy_mapping is not None:
+            self._build_all_elements()
+        return super().bh_named_children
+
+    @property
+    def bh_children_size(self):
+        if self._lazy_mapping is not None:
+            return len(self._lazy_mapping)
+        return super().bh_children_size
+
+    def bh_remove_named_child(self, name):
+        if self._lazy_mapping is not None:
+            self._build_all_elements()
+        super().bh_remove_named_child(name)
+
+
 def node2statecls_generator(*state_clses):
 
     def _decorator(func):
@@ -619,15 +962,31 @@ def node2statecls_default_input():
     pass
 
 
-def create_attribute_state_tree_for_input(node, value):
+@node2statecls_generator(
+    BoolStateForInputDefault,
+    IntegerStateForInputDefault,
+    FloatStateForInputDefault,
+    StringStateForInputDefault,
+    ArrayStateForInputDefault,
+    TupleStateForInputDefault,
+    LazyObjectStateForInput,
+)
+def node2statecls_lazy_input():
+    pass
+
+
+def create_attribute_state_tree_for_input(node, value, schema=None,
+                                          lazy=False):
     return create_attribute_state_tree(
         node, value,
-        node2statecls_default_input,
+        node2statecls_lazy_input if lazy else node2statecls_default_input,
+        schema,
     )
 
 
-def create_attribute_state_tree_for_output(node, value):
+def create_attribute_state_tree_for_output(node, value, schema=None):
     return create_attribute_state_tree(
         node, value,
         node2statecls_default_output,
+        schema,
     )
@@ -40,6 +40,7 @@ special attributes:
 
 import collections.abc as abc
 import inspect
+import sys
 
 from restpf.utils.constants import (
     HTTPMethodConfig,
@@ -112,6 +113,7 @@ class Attribute(BehaviorTreeNode):
 
         # shared settings.
         self.rename('undefined')
+        self._path = None
 
         # process options.
         self._options = options
@@ -154,6 +156,24 @@ class Attribute(BehaviorTreeNode):
     def name(self):
         return self.bh_name
 
+    def freeze_path(self):
+        '''
+        Compute the paths of this attribute and its descendants. Should be
+        called after the attribute tree is completed.
+        '''
+        self._path = tuple(map(sys.intern, self.bh_path))
+        for child in self.bh_children:
+            child.freeze_path()
+
+    @property
+    def path(self):
+        '''
+        Immutable path of names from the root, computed once.
+        '''
+        if self._path is None:
+            self._path = tuple(map(sys.intern, self.bh_path))
+        return self._path
+
 
 def _generate_http_method_context_operator(method_prefix):
     return {
@@ -20,13 +20,18 @@ foo.username
 """
 
 import inspect
+import pickle
+from collections import deque
 
 from restpf.utils.constants import (
     HTTPMethodConfig,
     CallbackRegistrarOptions,
 )
-from restpf.utils.helper_classes import (
-    TreeState,
+from restpf.utils.helper_classes import LRUCache
+from restpf.utils.helper_functions import (
+    namedtuple_with_default,
+    parallel_groups_of_callbacks,
+    compile_callback_invoker,
 )
 from .attributes import (
     Attribute,
@@ -44,21 +49,79 @@ class CallbackRegistrar:
         HTTPMethodConfig,
     ))
 
+    # size of LRUCache created for the `ttl` option.
+    CALLBACK_CACHE_MAXSIZE = 1024
+
+    # kwargs bound to the pipeline of a request, cannot be sent to the worker
+    # processes of cpu_bound callbacks.
+    PROCESS_UNSAFE_KWARGS = frozenset([
+        'callback_kwargs',
+        'var_collector',
+    ])
+
     def __init__(self, callback_info, attr_obj):
         self._callback_info = callback_info
         self._attr_obj = attr_obj
 
         self.context = None
-        self.attr_path = []
+        self.attr_path = ()
         self.options = None
         self.callback = None
 
+    def _check_cpu_bound_callback(self, invoker):
+        if invoker.is_coroutine:
+            raise RuntimeError('cpu_bound callback should not be coroutine.')
+
+        unsafe_kwargs = self.PROCESS_UNSAFE_KWARGS.intersection(
+            invoker.params,
+        )
+        if unsafe_kwargs:
+            raise RuntimeError(
+                'cpu_bound callback cannot accept: ' +
+                ', '.join(sorted(unsafe_kwargs)),
+            )
+
+        # sent to worker processes.
+        try:
+            pickled_func = pickle.dumps(self.callback)
+        except Exception:
+            raise RuntimeError('cpu_bound callback should be picklable.')
+        # bound methods share the invoker of the function.
+        if not inspect.ismethod(self.callback):
+            invoker.pickled_func = pickled_func
+
     def register(self):
         if self.context is None:
             raise RuntimeError('context not set')
 
+        # inspect the signature once.
+        invoker = compile_callback_invoker(self.callback)
+        if self.options and \
+                self.options.get(CallbackRegistrarOptions.CPU_BOUND.value):
+            self._check_cpu_bound_callback(invoker)
+        if self.options:
+            self._setup_callback_cache()
+
         self._callback_info.register_callback(self)
 
+    def _setup_callback_cache(self):
+        '''
+        With `ttl=<seconds>`, return values are memoized per resource id in
+        an LRUCache, which could also be given by `cache=`. Only for GET,
+        since a memoized callback is skipped regardless of the input.
+        '''
+        ttl = self.options.get(CallbackRegistrarOptions.TTL.value)
+        cache_key = CallbackRegistrarOptions.CACHE.value
+
+        if (ttl is not None or self.options.get(cache_key) is not None) and \
+                self.context is not HTTPMethodConfig.GET:
+            raise RuntimeError('ttl and cache are only allowed in GET.')
+
+        if ttl is not None and self.options.get(cache_key) is None:
+            self.options[cache_key] = LRUCache(
+                maxsize=self.CALLBACK_CACHE_MAXSIZE, ttl=ttl,
+            )
+
     def __getattr__(self, name):
         if self.context is None:
             context = self._AVAILABLE_CONTEXT.get(name)
@@ -68,7 +131,7 @@ class CallbackRegistrar:
                 if next_attr_obj is None:
                     raise RuntimeError('Invalid attribute: ' + name)
 
-                self.attr_path.append(name)
+                self.attr_path += (name,)
                 self._attr_obj = next_attr_obj
             else:
                 self.context = context
@@ -114,24 +177,27 @@ class CallbackInformation:
 
     def __init__(self, attr_obj):
         '''
-        (['next', [..., ]] 'value') => (callback, options)
+        path tuple => context => (callback, options)
         '''
-        self._registered_callback = TreeState()
-
-    def _locate_registered_callback_tree(self, path):
-        return self._registered_callback.touch(path, default={})
+        self._registered_callback = {}
+        # increased on every registration.
+        self.version = 0
 
     def _set_callback_and_options(self, path, context, callback, options):
         assert isinstance(context, HTTPMethodConfig)
 
-        obj = self._locate_registered_callback_tree(path)
-        obj.value[context] = (callback, options)
+        context2callback = self._registered_callback.setdefault(
+            tuple(path), {},
+        )
+        context2callback[context] = (callback, options)
 
     def get_registered_callback_and_options(self, path, context):
         assert isinstance(context, HTTPMethodConfig)
 
-        obj = self._locate_registered_callback_tree(path)
-        return obj.value.get(context, (None, None))
+        context2callback = self._registered_callback.get(tuple(path))
+        if context2callback is None:
+            return (None, None)
+        return context2callback.get(context, (None, None))
 
     def register_callback(self, callback_registrar):
         self._set_callback_and_options(
@@ -140,6 +206,7 @@ class CallbackInformation:
             callback_registrar.callback,
             callback_registrar.options,
         )
+        self.version += 1
 
 
 class SpecialHooksCallbackInformation(CallbackInformation):
@@ -152,6 +219,7 @@ class SpecialHooksCallbackInformation(CallbackInformation):
         for item in [
             CallbackRegistrarOptions.BEFORE_ALL,
             CallbackRegistrarOptions.AFTER_ALL,
+            CallbackRegistrarOptions.VERSION,
         ]:
             if path[0] == item.value:
                 options[item.value] = True
@@ -167,6 +235,7 @@ class AttributeCollection:
         self._attr_obj = Object(*named_element_attrs)
         if not self._check_attr_obj(self._attr_obj):
             raise RuntimeError('TODO: AttributeCollection.__init__')
+        self._attr_obj.freeze_path()
 
         self._callback_info = CallbackInformation(self._attr_obj)
 
@@ -189,6 +258,29 @@ class AttributeCollection:
             path, context,
         )
 
+    @property
+    def callback_version(self):
+        return self._callback_info.version
+
+    def registered_callbacks(self, context):
+        '''
+        return [(attr, callback, options), ...] in BFS order of attributes.
+        '''
+        ret = []
+
+        queue = deque([self._attr_obj])
+        while queue:
+            attr = queue.popleft()
+            callback, options = self.get_registered_callback_and_options(
+                attr.path, context,
+            )
+            if callback:
+                ret.append((attr, callback, options))
+
+            queue.extend(attr.bh_children)
+
+        return ret
+
 
 class Attributes(AttributeCollection):
 
@@ -255,13 +347,28 @@ class SpecialHooks(AttributeCollection):
         super().__init__({
             CallbackRegistrarOptions.BEFORE_ALL.value: Integer,
             CallbackRegistrarOptions.AFTER_ALL.value: Integer,
+            # returns a version stamp of the resource, see GET pipeline.
+            CallbackRegistrarOptions.VERSION.value: Integer,
         })
         self._callback_info = SpecialHooksCallbackInformation(self._attr_obj)
 
 
+CallbackPlan = namedtuple_with_default(
+    'CallbackPlan',
+    # versions of callback registrations the plan is built upon.
+    ('versions', ()),
+    # ((collection_name, [(attr, callback, options), ...]), ...)
+    ('collections', ()),
+    # output of parallel_groups_of_callbacks.
+    ('parallel_groups', ()),
+)
+
+
 # TODO: refactor class attribute definitions.
 class Resource:
 
+    COLLECTION_NAMES = ('special_hooks', 'attributes', 'relationships')
+
     def __init__(self,
                  name,
                  attributes,
@@ -278,20 +385,24 @@ class Resource:
         self._relationships = relationships or Relationships()
         self._special_hooks = SpecialHooks()
 
+        # HTTPMethodConfig -> CallbackPlan.
+        self._callback_plans = {}
+
     def _generate_id_obj(self, id_attr, id_appear_in_post):
         if id_attr not in (Integer, String) and \
                 not isinstance(id_attr, (Integer, String)):
             raise RuntimeError('_generate_id_obj')
 
         if inspect.isclass(id_attr):
-            return id_attr(
+            id_attr = id_attr(
                 appear_in_get=AppearanceConfig.REQUIRE,
                 appear_in_post=id_appear_in_post,
                 appear_in_patch=AppearanceConfig.REQUIRE,
                 appear_in_put=AppearanceConfig.REQUIRE,
             )
-        else:
-            return id_attr
+
+        id_attr.freeze_path()
+        return id_attr
 
     @property
     def attributes_obj(self):
@@ -305,10 +416,57 @@ class Resource:
     def special_hooks_obj(self):
         return self._special_hooks
 
-    def __getattribute__(self, name):
-        if name in ('attributes', 'relationships', 'special_hooks'):
-            # for callback registrater.
-            obj = super().__getattribute__(f'_{name}')
-            return obj.create_callback_registrar()
-        else:
-            return super().__getattribute__(name)
+    # for callback registrater.
+    @property
+    def attributes(self):
+        return self._attributes.create_callback_registrar()
+
+    @property
+    def relationships(self):
+        return self._relationships.create_callback_registrar()
+
+    @property
+    def special_hooks(self):
+        return self._special_hooks.create_callback_registrar()
+
+    def _attr_collections(self):
+        # ordered as COLLECTION_NAMES.
+        return (self._special_hooks, self._attributes, self._relationships)
+
+    def _build_callback_plan(self, method, versions):
+        collections = []
+        callback_and_options = []
+
+        for name, attr_collection in zip(
+            self.COLLECTION_NAMES, self._attr_collections(),
+        ):
+            registered = attr_collection.registered_callbacks(method)
+            collections.append((name, registered))
+
+            for _, callback, options in registered:
+                callback_and_options.append((callback, options or {}))
+
+        return CallbackPlan(
+            versions=versions,
+            collections=tuple(collections),
+            parallel_groups=parallel_groups_of_callbacks(
+                callback_and_options,
+            ),
+        )
+
+    def callback_plan(self, method):
+        '''
+        Selection and schedule of the callbacks registered for `method`.
+        Rebuilt only if a callback has been registered since the last call.
+        '''
+        versions = tuple(
+            attr_collection.callback_version
+            for attr_collection in self._attr_collections()
+        )
+
+        plan = self._callback_plans.get(method)
+        if plan is None or plan.versions != versions:
+            plan = self._build_callback_plan(method, versions)
+            self._callback_plans[method] = plan
+
+        return plan
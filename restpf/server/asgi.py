@@ -0,0 +1,217 @@
+"""
+Minimal ASGI application routing requests to the single-resource runners, and
+an in-process client driving it without sockets.
+
+Example:
+
+app = ASGIApplication([foo, bar], prefix='/api')
+
+client = ASGITestClient(app)
+response = await client.request('GET', '/api/foo/1')
+"""
+
+import json
+
+from restpf.utils.helper_functions import namedtuple_with_default
+
+from .dispatch import (
+    CONTENT_TYPE,
+    ResourceDispatcher,
+)
+
+
+def _find_header(raw_headers, name):
+    for key, value in raw_headers:
+        if key.lower() == name:
+            return value.decode('latin-1')
+    return None
+
+
+class ASGIApplication:
+
+    def __init__(self, resources, prefix='', dispatcher=None):
+        self.prefix = prefix.rstrip('/')
+        self.dispatcher = dispatcher or ResourceDispatcher()
+        for resource in resources:
+            self.dispatcher.add_resource(resource)
+
+    def _route(self, path):
+        '''
+        return (resource_type, raw_resource_id) or None.
+        '''
+        if not path.startswith(self.prefix + '/'):
+            return None
+
+        segments = path[len(self.prefix) + 1:].rstrip('/').split('/')
+        if len(segments) == 1 and segments[0]:
+            return segments[0], None
+        if len(segments) == 2 and all(segments):
+            return segments[0], segments[1]
+        return None
+
+    @staticmethod
+    async def _read_body(receive):
+        # body arrives in chunks of `http.request` messages.
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+
+            body += message.get('body', b'')
+            if not message.get('more_body', False):
+                return bytes(body)
+
+    @staticmethod
+    async def _lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    async def _send_response(send, status, body, headers):
+        raw_headers = [
+            (b'content-type', CONTENT_TYPE.encode()),
+            (b'content-length', str(len(body)).encode()),
+        ]
+        raw_headers.extend(
+            (key.encode('latin-1'), value.encode('latin-1'))
+            for key, value in headers.items()
+        )
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': raw_headers,
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': body,
+        })
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise RuntimeError('unsupported scope type: ' + scope['type'])
+
+        route = self._route(scope['path'])
+        if route is None:
+            await self._send_response(send, 404, b'', {})
+            return
+
+        body = await self._read_body(receive)
+        if body is None:
+            return
+
+        resource_type, raw_resource_id = route
+        response = await self.dispatcher.dispatch(
+            scope['method'],
+            resource_type,
+            raw_resource_id,
+            body,
+            {
+                'if-none-match': _find_header(
+                    scope.get('headers', ()), b'if-none-match',
+                ),
+            },
+        )
+
+        await self._send_response(
+            send,
+            response.status,
+            response.body,
+            response.headers,
+        )
+
+
+TestResponse = namedtuple_with_default(
+    'TestResponse',
+    ('status', None),
+    ('headers', {}),
+    ('body', b''),
+)
+
+
+class ASGITestClient:
+
+    '''
+    Drives an ASGI application in-process. Request bodies are sent in chunks
+    of `chunk_size` bytes.
+    '''
+
+    # not a test class.
+    __test__ = False
+
+    def __init__(self, app, chunk_size=65536):
+        self.app = app
+        self.chunk_size = chunk_size
+
+    def _request_messages(self, body):
+        if not body:
+            return [{'type': 'http.request', 'body': b''}]
+
+        messages = []
+        for start in range(0, len(body), self.chunk_size):
+            messages.append({
+                'type': 'http.request',
+                'body': body[start:start + self.chunk_size],
+                'more_body': start + self.chunk_size < len(body),
+            })
+        return messages
+
+    async def request(self, method, path, body=b'', headers=None):
+        '''
+        `body` could be bytes or JSON-like object. Return TestResponse.
+        '''
+        if not isinstance(body, (bytes, bytearray)):
+            body = json.dumps(body).encode()
+
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method.upper(),
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': b'',
+            'root_path': '',
+            'headers': [
+                (key.lower().encode('latin-1'), value.encode('latin-1'))
+                for key, value in (headers or {}).items()
+            ],
+        }
+
+        messages = iter(self._request_messages(body))
+
+        async def receive():
+            return next(messages, {'type': 'http.disconnect'})
+
+        status = None
+        response_headers = {}
+        chunks = []
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                response_headers.update(
+                    (key.decode('latin-1'), value.decode('latin-1'))
+                    for key, value in message.get('headers', ())
+                )
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+
+        await self.app(scope, receive, send)
+
+        return TestResponse(
+            status=status,
+            headers=response_headers,
+            body=b''.join(chunks),
+        )
@@ -0,0 +1,233 @@
+"""
+Framework independent dispatching of JSON:API-style requests to prepared
+single-resource runners.
+
+Routes:
+
+- `POST /<type>`
+- `GET|PATCH|DELETE /<type>/<id>`
+
+Requests are dispatched to runners prepared once per (resource, method), the
+request body is parsed straight into `raw_attributes`/`raw_relationships`.
+"""
+
+from restpf.utils.helper_functions import namedtuple_with_default
+from restpf.resource.attributes import (
+    HTTPMethodConfig,
+    Integer,
+)
+from restpf.resource.attribute_states import AttributeStateValidationError
+from restpf.pipeline.protocol import (
+    CallbackTimeoutError,
+    InputStateValidationError,
+)
+from restpf.pipeline.codecs import create_codec
+from restpf.pipeline.single_resource.get import (
+    GetSingleResourcePipelineRunner,
+)
+from restpf.pipeline.single_resource.post import (
+    PostSingleResourcePipelineRunner,
+)
+from restpf.pipeline.single_resource.patch import (
+    PatchSingleResourcePipelineRunner,
+)
+from restpf.pipeline.single_resource.delete import (
+    DeleteSingleResourcePipelineRunner,
+)
+
+CONTENT_TYPE = 'application/vnd.api+json'
+
+
+Response = namedtuple_with_default(
+    'Response',
+    ('status', 200),
+    # encoded JSON document.
+    ('body', b''),
+    ('headers', {}),
+)
+
+
+class DispatchError(RuntimeError):
+
+    def __init__(self, status, detail):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+class ResourceDispatcher:
+
+    METHOD2RUNNER_CLS = {
+        HTTPMethodConfig.GET: GetSingleResourcePipelineRunner,
+        HTTPMethodConfig.POST: PostSingleResourcePipelineRunner,
+        HTTPMethodConfig.PATCH: PatchSingleResourcePipelineRunner,
+        HTTPMethodConfig.DELETE: DeleteSingleResourcePipelineRunner,
+    }
+
+    def __init__(self, configure_runner=None, codec=None):
+        '''
+        `configure_runner(runner, resource, method)` is called before a runner
+        is prepared, e.g. to set the callback scheduler or caches. Documents
+        are encoded and decoded by `codec`, see restpf.pipeline.codecs.
+        '''
+        self._configure_runner = configure_runner
+        self.codec = codec or create_codec()
+        # resource name -> (resource, method -> prepared runner).
+        self._resources = {}
+
+    def add_resource(self, resource):
+        method2runner = {}
+
+        for method, runner_cls in self.METHOD2RUNNER_CLS.items():
+            runner = runner_cls()
+            if self._configure_runner:
+                self._configure_runner(runner, resource, method)
+            runner.prepare(
+                resource,
+                representation_generator_options={'codec': self.codec},
+            )
+            method2runner[method] = runner
+
+        self._resources[resource.name] = (resource, method2runner)
+
+    @property
+    def resource_names(self):
+        return list(self._resources)
+
+    def _locate(self, method, resource_type):
+        entry = self._resources.get(resource_type)
+        if entry is None:
+            raise DispatchError(404, 'unknown resource type.')
+        resource, method2runner = entry
+
+        try:
+            method = HTTPMethodConfig(method.upper())
+        except ValueError:
+            method = None
+        runner = method2runner.get(method)
+        if runner is None:
+            raise DispatchError(405, 'method not allowed.')
+
+        return resource, method, runner
+
+    @staticmethod
+    def _parse_resource_id(resource, raw_resource_id):
+        if raw_resource_id is None or \
+                not isinstance(resource.id_obj, Integer):
+            return raw_resource_id
+        try:
+            return int(raw_resource_id)
+        except ValueError:
+            raise DispatchError(404, 'invalid resource id.')
+
+    def _error_response(self, status, detail):
+        return Response(
+            status=status,
+            body=self.codec.encode({
+                'errors': [
+                    {
+                        'status': str(status),
+                        'detail': detail,
+                    },
+                ],
+            }),
+        )
+
+    def _parse_body(self, resource, body):
+        if not body:
+            raise DispatchError(400, 'empty body.')
+        try:
+            document = self.codec.decode(body)
+        except ValueError:
+            raise DispatchError(400, 'invalid JSON.')
+
+        data = document.get('data') if isinstance(document, dict) else None
+        if not isinstance(data, dict) or data.get('type') != resource.name:
+            raise DispatchError(400, 'invalid resource object.')
+
+        attributes = data.get('attributes') or {}
+        relationships = data.get('relationships') or {}
+        if not isinstance(attributes, dict) or \
+                not isinstance(relationships, dict):
+            raise DispatchError(400, 'invalid resource object.')
+
+        return data.get('id'), attributes, relationships
+
+    async def _get(self, resource, runner, resource_id, body, headers):
+        state = await runner.run(
+            raw_resource_id=resource_id,
+            if_none_match=headers.get('if-none-match'),
+        )
+        headers = {'etag': state.etag} if state.etag else {}
+
+        if state.not_modified:
+            return Response(status=304, headers=headers)
+        # wrap the encoded representation without decoding.
+        return Response(
+            body=b'{"data":' + state.encoded_representation + b'}',
+            headers=headers,
+        )
+
+    async def _post(self, resource, runner, resource_id, body, headers):
+        submitted_id, attributes, relationships = \
+            self._parse_body(resource, body)
+
+        state = await runner.run(
+            raw_resource_id=submitted_id,
+            raw_attributes=attributes,
+            raw_relationships=relationships,
+        )
+
+        generated_id = state.var_collector.get('generated_resource_id')
+        if generated_id is None:
+            return Response(status=204)
+        return Response(
+            status=201,
+            body=self.codec.encode({
+                'data': {
+                    'type': resource.name,
+                    'id': generated_id,
+                },
+            }),
+        )
+
+    async def _patch(self, resource, runner, resource_id, body, headers):
+        _, attributes, relationships = self._parse_body(resource, body)
+
+        await runner.run(
+            raw_resource_id=resource_id,
+            raw_attributes=attributes,
+            raw_relationships=relationships,
+        )
+        return Response(status=204)
+
+    async def _delete(self, resource, runner, resource_id, body, headers):
+        await runner.run(raw_resource_id=resource_id)
+        return Response(status=204)
+
+    async def dispatch(self, method, resource_type, raw_resource_id=None,
+                       body=None, headers=None):
+        '''
+        `headers` is a mapping of lower-cased header names. Return Response.
+        '''
+        try:
+            resource, method, runner = self._locate(method, resource_type)
+
+            # POST to collection, others to individual resource.
+            if (method is HTTPMethodConfig.POST) != (raw_resource_id is None):
+                raise DispatchError(405, 'method not allowed.')
+
+            handler = getattr(self, '_' + method.value.lower())
+            return await handler(
+                resource, runner,
+                self._parse_resource_id(resource, raw_resource_id),
+                body, headers or {},
+            )
+
+        except DispatchError as error:
+            return self._error_response(error.status, error.detail)
+        except (AttributeStateValidationError,
+                InputStateValidationError) as error:
+            return self._error_response(400, str(error))
+        except CallbackTimeoutError as error:
+            return self._error_response(504, str(error))
@@ -0,0 +1,64 @@
+"""
+Mounts resources on a Sanic app.
+
+Example:
+
+app = Sanic(__name__)
+mount(app, [foo, bar], prefix='/api')
+"""
+
+from sanic.response import raw
+
+from .dispatch import (
+    CONTENT_TYPE,
+    ResourceDispatcher,
+)
+
+
+def _to_sanic_response(response):
+    return raw(
+        response.body,
+        status=response.status,
+        headers=response.headers,
+        content_type=CONTENT_TYPE,
+    )
+
+
+def mount(app, resources, prefix='', dispatcher=None):
+    '''
+    Register routes of `resources` on `app`, return the dispatcher.
+    '''
+    dispatcher = dispatcher or ResourceDispatcher()
+    for resource in resources:
+        dispatcher.add_resource(resource)
+
+    async def handle(request, resource_type, resource_id=None):
+        response = await dispatcher.dispatch(
+            request.method,
+            resource_type,
+            resource_id,
+            request.body,
+            {
+                'if-none-match': request.headers.get('if-none-match'),
+            },
+        )
+        return _to_sanic_response(response)
+
+    async def handle_collection(request, resource_type):
+        return await handle(request, resource_type)
+
+    async def handle_individual(request, resource_type, resource_id):
+        return await handle(request, resource_type, resource_id)
+
+    app.add_route(
+        handle_collection,
+        prefix + '/<resource_type>',
+        methods=['POST'],
+    )
+    app.add_route(
+        handle_individual,
+        prefix + '/<resource_type>/<resource_id>',
+        methods=['GET', 'PATCH', 'DELETE'],
+    )
+
+    return dispatcher
@@ -7,7 +7,7 @@ classes:
 BehaviorTreeRoot is a special case of BehaviorTreeNode.
 """
 
-from restpf.utils.helper_classes import LinkedPath
+from types import MappingProxyType
 
 
 class classproperty:
@@ -19,18 +19,34 @@ class classproperty:
         return self._f(owner)
 
 
+# shared by all nodes without children.
+_EMPTY_CHILDREN = ()
+_EMPTY_NAMED_CHILDREN = MappingProxyType({})
+
+
 class BehaviorTreeNode:
 
+    '''
+    Containers of children are allocated on adding the first child, hence a
+    leaf only carries a few slots.
+    '''
+
+    __slots__ = (
+        '_bh_name',
+        '_bh_root',
+        '_bh_parent',
+        '_bh_children',
+        '_bh_named_children',
+    )
+
     def __init__(self):
         self._bh_name = type(self).__name__.lower()
 
         self._bh_root = None
         self._bh_parent = None
 
-        self._bh_children = []
-        self._bh_named_children = {}
-
-        self._bh_linked_path = LinkedPath()
+        self._bh_children = None
+        self._bh_named_children = None
 
     def bh_rename(self, name):
         self._bh_name = name
@@ -44,45 +60,52 @@ class BehaviorTreeNode:
 
         child._bh_parent = self
         child._bh_root = self._bh_root
-        child._bh_linked_path.set_name_and_parent(
-            child._bh_name,
-            self._bh_linked_path,
-        )
+
+        if self._bh_children is None:
+            self._bh_children = []
+            self._bh_named_children = {}
 
         self._bh_children.append(child)
         self._bh_named_children[child._bh_name] = child
 
     @property
     def bh_children(self):
-        return self._bh_children
+        return self._bh_children or _EMPTY_CHILDREN
 
     @property
     def bh_named_children(self):
-        return self._bh_named_children
+        return self._bh_named_children or _EMPTY_NAMED_CHILDREN
 
     @property
     def bh_children_size(self):
-        return len(self._bh_children)
+        return len(self._bh_children) if self._bh_children else 0
 
     def bh_child(self, idx=0):
-        return self._bh_children[idx]
+        return self.bh_children[idx]
 
     def bh_named_child(self, name):
-        return self._bh_named_children.get(name)
+        return self.bh_named_children.get(name)
 
     def bh_remove_named_child(self, name):
-        self._bh_named_children.pop(name, None)
+        if self._bh_named_children:
+            self._bh_named_children.pop(name, None)
 
     @property
     def bh_path(self):
-        if self._bh_linked_path is None:
-            return []
-        else:
-            return iter(self._bh_linked_path)
+        path = []
+
+        node = self
+        while node._bh_parent is not None:
+            path.append(node._bh_name)
+            node = node._bh_parent
+
+        return reversed(path)
 
 
 class BehaviorTreeRoot(BehaviorTreeNode):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         self._bh_root = self
@@ -90,6 +113,8 @@ class BehaviorTreeRoot(BehaviorTreeNode):
 
 class BehaviorTreeNodeState(BehaviorTreeNode):
 
+    __slots__ = ('_bh_node',)
+
     BH_NODECLS = None
 
     def __init__(self):
@@ -126,6 +151,12 @@ class BehaviorTreeNodeState(BehaviorTreeNode):
 
 class BehaviorTreeNodeStateLeaf(BehaviorTreeNodeState):
 
+    __slots__ = ('_bh_value',)
+
+    def __init__(self):
+        super().__init__()
+        self._bh_value = None
+
     def _set_bh_value(self, value):
         self._bh_value = value
 
@@ -136,4 +167,5 @@ class BehaviorTreeNodeStateLeaf(BehaviorTreeNodeState):
 
 
 class BehaviorTreeNodeStateNested(BehaviorTreeNodeState):
-    pass
+
+    __slots__ = ()
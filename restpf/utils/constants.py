@@ -41,6 +41,21 @@ class CallbackRegistrarOptions(EnumByLowerCaseName):
     BEFORE_ALL = auto()
     AFTER_ALL = auto()
     RUN_AFTER = auto()
+    PRIORITY = auto()
+    EXECUTOR = auto()
+    CPU_BOUND = auto()
+    TIMEOUT = auto()
+    TTL = auto()
+    CACHE = auto()
+    VERSION = auto()
+
+
+class CallbackPriorityConfig(Enum):
+
+    # smaller value runs first.
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
 
 
 class TopologySearchColor(Enum):
@@ -2,6 +2,9 @@ import collections.abc as abc
 import operator
 import copy
 import inspect
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
 
 from .helper_functions import method_named_args
 
@@ -17,48 +20,45 @@ class ContextOperator:
         },
         ...
     }
+
+    For each context, a subclass binding every op proxy to a plain
+    `operator.attrgetter` is generated once. Instantiation returns the shared
+    instance of that subclass.
     '''
 
     OPERATION_MAPPING = {}
 
-    def __init__(self, context):
-        self._co_operation2proxy = {}
-        assert isinstance(self.OPERATION_MAPPING, abc.Mapping)
+    context = None
+
+    # (cls, context) -> instance of generated class.
+    _co_instances = {}
 
-        for op_name, context2proxy in self.OPERATION_MAPPING.items():
+    @classmethod
+    def _co_generate_class(cls, context):
+        assert isinstance(cls.OPERATION_MAPPING, abc.Mapping)
+
+        namespace = {
+            'context': context,
+        }
+        for op_name, context2proxy in cls.OPERATION_MAPPING.items():
             assert isinstance(context2proxy, abc.Mapping)
             op_proxy = context2proxy.get(context)
             if op_proxy:
                 assert isinstance(op_proxy, str) and op_proxy.isidentifier()
-                self._co_operation2proxy[op_name] = op_proxy
-
-    def __getattribute__(self, name):
-        op_proxy = super().__getattribute__('_co_operation2proxy').get(name)
-        if op_proxy is None:
-            return super().__getattribute__(name)
-        else:
-            return operator.attrgetter(op_proxy)
-
-
-class LinkedPath:
+                # attrgetter is not a descriptor, hence not bound to instance.
+                namespace[op_name] = operator.attrgetter(op_proxy)
 
-    def __init__(self):
-        self.empty = True
+        return type(cls.__name__, (cls,), namespace)
 
-    def set_name_and_parent(self, name, parent):
-        self.empty = False
-        self.name = name
-        self.parent = parent
+    def __new__(cls, context):
+        key = (cls, context)
 
-    def __iter__(self):
-        node = self
-        path = []
+        instance = ContextOperator._co_instances.get(key)
+        if instance is None:
+            instance = object.__new__(cls._co_generate_class(context))
+            ContextOperator._co_instances[key] = instance
 
-        while not node.empty:
-            path.append(node.name)
-            node = node.parent
-
-        return reversed(path)
+        return instance
 
 
 class TreeState:
@@ -72,9 +72,9 @@ class TreeState:
         self._in_gap = in_gap
 
     def touch(self, path=None, default=None):
-        path = list([] if path is None else path)
+        path = () if path is None else tuple(path)
         if not path:
-            path = [self._TOP_LEVEL]
+            path = (self._TOP_LEVEL,)
 
         obj = self._obj
         last_gap = None
@@ -137,18 +137,54 @@ class TreeState:
     value = property(_value_get, _value_set)
 
 
+def _resolve_proxy_state(obj):
+    state = obj._pso_proxy_state
+    if type(state) is ContextVar:
+        # state of the current request.
+        state = state.get()
+    return state
+
+
+class _ProxyStateAttribute:
+
+    '''
+    Data descriptor forwarding an attribute to the bound proxy state.
+    '''
+
+    def __init__(self, name):
+        self._name = name
+
+    def __get__(self, obj, owner):
+        if obj is None:
+            return self
+        return getattr(_resolve_proxy_state(obj), self._name, None)
+
+    def __set__(self, obj, value):
+        setattr(_resolve_proxy_state(obj), self._name, value)
+
+
 class ProxyStateOperator:
 
+    '''
+    Attributes declared in PROXY_ATTRS (of all classes in the MRO) are
+    compiled into class-level descriptors on class creation, other attributes
+    are looked up as usual.
+    '''
+
     PROXY_ATTRS = []
 
+    # name -> default, compiled from PROXY_ATTRS of the MRO.
+    _pso_proxy_attrs = {}
+
     @classmethod
     def _get_proxy_attrs(cls):
         return cls.PROXY_ATTRS
 
-    def _cache_hierarchy_proxy_attrs(self):
+    @classmethod
+    def _cache_hierarchy_proxy_attrs(cls):
         ret = {}
 
-        for _cls in type(self).__mro__:
+        for _cls in cls.__mro__:
             proxy_attrs_accessor = getattr(_cls, '_get_proxy_attrs', None)
             if proxy_attrs_accessor is None:
                 continue
@@ -159,8 +195,6 @@ class ProxyStateOperator:
                     default = None
                 elif isinstance(attr, abc.Sequence) and len(attr) == 2:
                     name, default = attr
-                    if inspect.isclass(default):
-                        default = default()
                 else:
                     raise RuntimeError("wrong format of PROXY_ATTRS.")
 
@@ -168,39 +202,33 @@ class ProxyStateOperator:
 
         return ret
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        cls._pso_proxy_attrs = cls._cache_hierarchy_proxy_attrs()
+        for name in cls._pso_proxy_attrs:
+            setattr(cls, name, _ProxyStateAttribute(name))
+
     def bind_proxy_state(self, state):
-        # cache PROXY_ATTRS.
-        self.PROXY_ATTRS = self._cache_hierarchy_proxy_attrs()
+        '''
+        `state` could be a ContextVar holding the state of the current request,
+        in which case defaults are filled by `init_proxy_state` once the state
+        of a request is created.
+        '''
+        # expose compiled PROXY_ATTRS.
+        self.PROXY_ATTRS = self._pso_proxy_attrs
         # bind state.
         self._pso_proxy_state = state
-        # __getattribute__ works now.
         # bind default value.
-        for name, default in self.PROXY_ATTRS.items():
-            if getattr(self, name) is None:
-                setattr(self, name, default)
-
-    def __getattribute__(self, name):
-        use_default = False
-        try:
-            PROXY_ATTRS = object.__getattribute__(
-                self, 'PROXY_ATTRS',
-            )
-            _pso_proxy_state = object.__getattribute__(
-                self, '_pso_proxy_state',
-            )
-        except AttributeError:
-            use_default = True
+        if type(state) is not ContextVar:
+            self.init_proxy_state(state)
 
-        if use_default or name not in PROXY_ATTRS:
-            return object.__getattribute__(self, name)
-        else:
-            return getattr(_pso_proxy_state, name, None)
-
-    def __setattr__(self, name, value):
-        if name in self.PROXY_ATTRS:
-            setattr(self._pso_proxy_state, name, value)
-        else:
-            object.__setattr__(self, name, value)
+    def init_proxy_state(self, state):
+        for name, default in self._pso_proxy_attrs.items():
+            if getattr(state, name, None) is None:
+                if inspect.isclass(default):
+                    default = default()
+                setattr(state, name, default)
 
 
 class StateCreator(type):
@@ -215,3 +243,85 @@ class StateCreator(type):
 
         resultcls.__init__ = __init__
         return resultcls
+
+
+# default of LRUCache.get to tell a cached None from a miss.
+MISSING = object()
+
+
+class LRUCache:
+
+    '''
+    LRU cache of at most `maxsize` entries, each expires after `ttl` seconds
+    (never if None). Cached values are shared, hence should be treated as
+    read-only.
+    '''
+
+    def __init__(self, maxsize=1024, ttl=None, clock=time.monotonic):
+        if maxsize < 1:
+            raise RuntimeError('maxsize should be positive.')
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+
+        # key -> (expire_at, value), in LRU order.
+        self._entries = OrderedDict()
+
+        # increased on every invalidation. A value generated while an
+        # invalidation happened could be stale, hence is not cached.
+        self.invalidations = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            expire_at, value = entry
+            if expire_at is None or self._clock() < expire_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            # expired.
+            del self._entries[key]
+
+        self.misses += 1
+        return default
+
+    def set(self, key, value, invalidations=None):
+        '''
+        Return False if an invalidation happened since `invalidations` was
+        read, in which case `value` is not cached.
+        '''
+        if invalidations is not None and invalidations != self.invalidations:
+            return False
+
+        expire_at = None if self.ttl is None else self._clock() + self.ttl
+
+        self._entries[key] = (expire_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+        return True
+
+    def invalidate(self, key):
+        self.invalidations += 1
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self.invalidations += 1
+        self._entries.clear()
+
+    def snapshot(self):
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+        }
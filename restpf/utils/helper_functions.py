@@ -1,4 +1,8 @@
+import asyncio
+import contextvars
 import inspect
+import math
+import pickle
 
 import collections.abc as abc
 from collections import (
@@ -7,7 +11,10 @@ from collections import (
     namedtuple,
 )
 
-from functools import wraps
+from functools import (
+    partial,
+    wraps,
+)
 
 from restpf.utils.constants import (
     CallbackRegistrarOptions,
@@ -23,53 +30,131 @@ def namedtuple_with_default(name, *pairs):
     return gencls
 
 
+def replace_non_finite_floats(obj):
+    '''
+    Replace NaN and infinities (which are not valid JSON) in JSON-like `obj`
+    with None.
+    '''
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {
+            key: replace_non_finite_floats(value)
+            for key, value in obj.items()
+        }
+    if isinstance(obj, (list, tuple)):
+        return [replace_non_finite_floats(value) for value in obj]
+    return obj
+
+
 def to_iterable(element):
     if not isinstance(element, abc.Iterable):
         element = (element,)
     return element
 
 
-_extract_kwargs_subset_cache = {}
+# passed as `executor` to run in the default executor of loop.
+LOOP_DEFAULT_EXECUTOR = object()
 
 
-def _extract_kwargs_subset(func, kwargs):
+class CallbackInvoker:
 
-    if func in _extract_kwargs_subset_cache:
-        params_all, params_without_default = _extract_kwargs_subset_cache[func]
+    '''
+    Signature information of a callable, extracted once. Kwargs are picked
+    from a mapping by the parameter names, hence the mapping could resolve
+    its values on demand.
+    '''
 
-    else:
+    _MISSING = object()
+
+    def __init__(self, func):
         sig_parameters = inspect.signature(func).parameters
 
-        params_all = set(sig_parameters)
-        params_without_default = set(filter(
+        self.is_coroutine = inspect.iscoroutinefunction(func)
+        self.params = tuple(sig_parameters)
+        # set on registration of cpu_bound callback, see `call_pickled`.
+        self.pickled_func = None
+        self.params_without_default = frozenset(filter(
             lambda k: sig_parameters[k].default is inspect.Parameter.empty,
-            params_all,
+            self.params,
         ))
 
-        _extract_kwargs_subset_cache[func] = (
-            params_all, params_without_default,
+    def extract_kwargs(self, kwargs_source):
+        kwargs = {}
+        for name in self.params:
+            value = kwargs_source.get(name, self._MISSING)
+            if value is not self._MISSING:
+                kwargs[name] = value
+            elif name in self.params_without_default:
+                raise RuntimeError('Missing keys')
+        return kwargs
+
+    async def invoke(self, func, kwargs_source, executor=None):
+        '''
+        A synchronous `func` is run in `executor` if given, within a copy of
+        the current context.
+        '''
+        kwargs = self.extract_kwargs(kwargs_source)
+
+        if self.is_coroutine:
+            return await func(**kwargs)
+
+        if executor is None:
+            return func(**kwargs)
+
+        if executor is LOOP_DEFAULT_EXECUTOR:
+            executor = None
+
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            executor,
+            partial(context.run, func, **kwargs),
         )
 
-    kwargs_keys = set(kwargs)
 
-    if not params_without_default <= kwargs_keys:
-        raise RuntimeError('Missing keys')
+_callback_invoker_cache = {}
+
+# pickled function -> function, in worker processes.
+_unpickled_func_cache = {}
 
-    intersection = params_all & kwargs_keys
-    kwargs_subset = {key: kwargs[key] for key in intersection}
 
-    return kwargs_subset
+def call_pickled(pickled_func, **kwargs):
+    '''
+    Run in worker processes, `pickled_func` is unpickled once per process.
+    '''
+    func = _unpickled_func_cache.get(pickled_func)
+    if func is None:
+        func = pickle.loads(pickled_func)
+        _unpickled_func_cache[pickled_func] = func
+    return func(**kwargs)
+
+
+def compile_callback_invoker(func):
+    # bound methods of the same function share the same invoker.
+    if inspect.ismethod(func):
+        key = (func.__func__, True)
+    else:
+        key = (func, False)
+
+    invoker = _callback_invoker_cache.get(key)
+    if invoker is None:
+        invoker = CallbackInvoker(func)
+        _callback_invoker_cache[key] = invoker
+
+    return invoker
 
 
 async def async_call(func, *args, **kwargs):
+    invoker = compile_callback_invoker(func)
+
     if not args:
         # turn on kwargs filtering.
-        kwargs = _extract_kwargs_subset(func, kwargs)
+        return await invoker.invoke(func, kwargs)
 
-    if inspect.iscoroutinefunction(func):
-        return await func(*args, **kwargs)
-    else:
-        return func(*args, **kwargs)
+    ret = func(*args, **kwargs)
+    if invoker.is_coroutine:
+        ret = await ret
+    return ret
 
 
 def bind_self_with_options(names, self, options):
@@ -49,11 +49,21 @@ setup(
         'Development Status :: 1 - Planning',
         'Intended Audience :: Developers',
         'Topic :: Software Development :: Libraries',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
     ],
     # critical configurations.
-    packages=find_packages(),
+    python_requires='>=3.9',
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     install_requires=load_requirements('requirements.txt'),
+    extras_require={
+        # numpy.ndarray accepted as the value of Array.
+        'numpy': ['numpy'],
+        # faster encoders of representations, see restpf.pipeline.codecs.
+        'orjson': ['orjson'],
+        'ujson': ['ujson'],
+    },
     entry_points={
         'console_scripts': [
             'restpf_cli = restpf.main:entry_point'
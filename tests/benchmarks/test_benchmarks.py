@@ -0,0 +1,21 @@
+import pytest
+
+from benchmarks.schemas import (
+    CALLBACK_STYLES,
+    METHODS,
+)
+from benchmarks.runner import (
+    STAGES,
+    run_case,
+)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('method', METHODS)
+@pytest.mark.parametrize('style', CALLBACK_STYLES)
+async def test_run_case(method, style):
+    result = await run_case(method, 5, 3, style, 2, memory_requests=1)
+
+    assert result['requests_per_sec'] > 0
+    assert set(STAGES) == set(result['stages_ms'])
+    assert result['peak_kib_per_request'] > 0
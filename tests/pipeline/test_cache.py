@@ -0,0 +1,174 @@
+import pytest
+
+from tests.utils.attr_config import *
+from restpf.utils.helper_classes import LRUCache
+from restpf.resource.definition import (
+    Attributes,
+    Resource,
+)
+from restpf.pipeline.cache import (
+    RepresentationCache,
+)
+from restpf.pipeline.single_resource.get import (
+    GetSingleResourcePipelineRunner,
+)
+from restpf.pipeline.single_resource.patch import (
+    PatchSingleResourcePipelineRunner,
+)
+
+
+def test_representation_cache():
+    now = [0]
+    cache = RepresentationCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert 1 == cache.get('a')
+    # 'b' is the least recently used.
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert 1 == cache.get('a')
+    assert 3 == cache.get('c')
+
+    now[0] = 10
+    assert cache.get('a') is None
+    assert cache.get('c') is None
+    assert 0 == len(cache)
+
+    invalidations = cache.invalidations
+    cache.invalidate('a')
+    assert not cache.set('a', 1, invalidations)
+    assert cache.set('a', 1, cache.invalidations)
+
+    assert {
+        'size': 1,
+        'hits': 3,
+        'misses': 3,
+        'invalidations': 1,
+    } == cache.snapshot()
+
+
+@pytest.mark.asyncio
+async def test_cached_get():
+    test = Resource(
+        'test',
+        Attributes({
+            'foo': Integer,
+        }),
+    )
+    db = {1: 10, 2: 20}
+    called = []
+
+    @test.attributes.foo.GET
+    def get_foo(resource_id):
+        called.append(resource_id)
+        return db[resource_id]
+
+    @test.attributes.foo.PATCH
+    def patch_foo(resource_id, state):
+        db[resource_id] = state.value
+
+    cache = RepresentationCache()
+
+    get_runner = GetSingleResourcePipelineRunner()
+    get_runner.set_representation_cache(cache)
+    get_runner.prepare(test)
+
+    patch_runner = PatchSingleResourcePipelineRunner()
+    patch_runner.set_representation_cache(cache)
+    patch_runner.prepare(test)
+
+    async def get_foo_value(resource_id):
+        state = await get_runner.run(raw_resource_id=resource_id)
+        return state.representation['attributes']['foo']['value']
+
+    assert 10 == await get_foo_value(1)
+    assert 10 == await get_foo_value(1)
+    assert 20 == await get_foo_value(2)
+    assert [1, 2] == called
+
+    # mutating a hit does not affect the cached entry.
+    state = await get_runner.run(raw_resource_id=1)
+    state.representation['attributes']['foo']['value'] = 'mutated'
+    state.representation['extra'] = True
+    state = await get_runner.run(raw_resource_id=1)
+    assert 10 == state.representation['attributes']['foo']['value']
+    assert 'extra' not in state.representation
+    assert [1, 2] == called
+
+    # entity tag is cached with the representation.
+    state = await get_runner.run(raw_resource_id=1)
+    state = await get_runner.run(raw_resource_id=1, if_none_match=state.etag)
+    assert state.not_modified
+    assert [1, 2] == called
+
+    await patch_runner.run(
+        raw_resource_id=1,
+        raw_attributes={'foo': 11},
+        raw_relationships={},
+    )
+    assert 11 == await get_foo_value(1)
+    assert 20 == await get_foo_value(2)
+    assert [1, 2, 1] == called
+
+    # failed run does not invalidate.
+    with pytest.raises(RuntimeError):
+        await patch_runner.run(
+            raw_resource_id=2,
+            raw_attributes={'foo': 'wrong'},
+            raw_relationships={},
+        )
+    assert 20 == await get_foo_value(2)
+    assert [1, 2, 1] == called
+
+
+@pytest.mark.asyncio
+async def test_memoized_callback():
+    test = Resource(
+        'test',
+        Attributes({
+            'foo': Integer,
+            'bar': Integer,
+        }),
+    )
+    now = [0]
+    bar_cache = LRUCache(ttl=10, clock=lambda: now[0])
+    called = []
+
+    @test.attributes.foo.GET(ttl=60)
+    def get_foo(resource_id):
+        called.append(('foo', resource_id))
+        return resource_id
+
+    @test.attributes.bar.GET(cache=bar_cache)
+    def get_bar(resource_id):
+        called.append(('bar', resource_id))
+        return resource_id + now[0]
+
+    # writes are never memoized.
+    with pytest.raises(RuntimeError):
+        test.attributes.foo.PATCH(ttl=60)(lambda state: None)
+    with pytest.raises(RuntimeError):
+        test.attributes.bar.PATCH(cache=bar_cache)(lambda state: None)
+
+    tp = GetSingleResourcePipelineRunner()
+    tp.prepare(test)
+
+    for _ in range(2):
+        for resource_id in (1, 2):
+            state = await tp.run(raw_resource_id=resource_id)
+            attributes = state.representation['attributes']
+            assert resource_id == attributes['foo']['value']
+            assert resource_id == attributes['bar']['value']
+
+    assert [
+        ('foo', 1), ('bar', 1),
+        ('foo', 2), ('bar', 2),
+    ] == called
+
+    # bar expires.
+    now[0] = 10
+    called.clear()
+    state = await tp.run(raw_resource_id=1)
+    assert 11 == state.representation['attributes']['bar']['value']
+    assert [('bar', 1)] == called
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from tests.utils.attr_config import *
+from restpf.resource.definition import (
+    Attributes,
+    Resource,
+)
+from restpf.pipeline.codecs import (
+    CODEC_CLSES,
+    StdlibJSONCodec,
+    create_codec,
+)
+from restpf.pipeline.single_resource.get import (
+    GetSingleResourcePipelineRunner,
+)
+
+
+AVAILABLE_CODEC_CLSES = [
+    codec_cls for codec_cls in CODEC_CLSES if codec_cls.available()
+]
+
+
+@pytest.mark.parametrize('codec_cls', AVAILABLE_CODEC_CLSES)
+def test_codec_output(codec_cls):
+    codec = codec_cls()
+    obj = {
+        'a': [0.1, 1.0, 1 / 3, float('nan'), float('inf')],
+        'b': 'café/測',
+        'c': None,
+    }
+
+    # same output across codecs.
+    assert StdlibJSONCodec().encode(obj) == codec.encode(obj)
+    assert (
+        '{"a":[0.1,1.0,0.3333333333333333,null,null],'
+        '"b":"café/測","c":null}'
+    ).encode() == codec.encode(obj)
+    assert {'a': [1.5]} == codec.decode(b'{"a":[1.5]}')
+
+
+def test_create_codec():
+    assert AVAILABLE_CODEC_CLSES[0] is type(create_codec())
+    assert 'json' == create_codec('json').NAME
+
+    codec = create_codec(ensure_ascii=True)
+    assert codec.SUPPORTS_ENSURE_ASCII
+    assert b'"caf\\u00e9"' == codec.encode('café')
+
+    with pytest.raises(RuntimeError):
+        create_codec('unknown')
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('codec', [
+    *(codec_cls() for codec_cls in AVAILABLE_CODEC_CLSES),
+    create_codec(ensure_ascii=True),
+])
+async def test_encoded_representation(codec):
+    test = Resource(
+        'test',
+        Attributes({
+            'foo': Array(Float),
+            'bar': String,
+            'baz': Float,
+            'obj': Object({
+                'items': Array(Object({'x': Float})),
+                'pair': Tuple(Integer, String),
+            }),
+        }),
+    )
+
+    @test.attributes.GET
+    def get():
+        return {
+            'foo': [0.5, float('nan'), float('inf'), 1e16],
+            'bar': 'café/測',
+            'baz': float('-inf'),
+            'obj': {
+                'items': [{'x': 0.1}, {'x': float('nan')}],
+                'pair': (1, 'é'),
+            },
+        }
+
+    async def encode(stream):
+        runner = GetSingleResourcePipelineRunner()
+        runner.prepare(
+            test,
+            representation_generator_options={
+                'stream': stream,
+                'codec': codec,
+            },
+        )
+        state = await runner.run(raw_resource_id=1)
+        if stream:
+            return b''.join(state.encoded_representation)
+        return state.encoded_representation
+
+    encoded = await encode(stream=False)
+    # fragments are formatted by the codec.
+    assert encoded == await encode(stream=True)
+
+    # strict JSON.
+    representation = json.loads(
+        encoded, parse_constant=lambda name: pytest.fail(name),
+    )
+    assert 1 == representation['id']
+    assert [0.5, None, None, 1e16] == \
+        representation['attributes']['foo']['value']
+    assert representation['attributes']['baz']['value'] is None
+    assert codec.ensure_ascii == (b'caf\\u00e9' in encoded)
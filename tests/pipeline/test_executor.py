@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+
+import pytest
+
+from tests.utils.attr_config import *
+from restpf.resource.definition import (
+    Attributes,
+    Resource,
+)
+from restpf.pipeline.single_resource.get import (
+    GetSingleResourcePipelineRunner,
+)
+from restpf.pipeline.single_resource.post import (
+    PostSingleResourcePipelineRunner,
+)
+
+
+@pytest.mark.asyncio
+async def test_sync_callbacks_in_executor():
+    test = Resource(
+        'test',
+        Attributes({
+            'a': Integer,
+            'b': Integer,
+            'c': Integer,
+            'd': Integer,
+        }),
+        None,
+    )
+    main_thread = threading.get_ident()
+    threads = {}
+
+    def register(name, **options):
+
+        @getattr(test.attributes, name).GET(**options)
+        def callback(resource_id):
+            threads[name] = threading.get_ident()
+            time.sleep(0.05)
+            return resource_id
+
+    register('a')
+    register('b')
+    register('c')
+    register('d', executor=False)
+
+    with ThreadPoolExecutor(4) as executor:
+        tp = GetSingleResourcePipelineRunner()
+        tp.set_callback_executor(executor)
+        tp.prepare(test)
+
+        start = time.perf_counter()
+        state = await tp.run(raw_resource_id=1)
+        # a, b and c run concurrently.
+        assert time.perf_counter() - start < 0.05 * 3
+
+    assert main_thread not in (threads['a'], threads['b'], threads['c'])
+    assert main_thread == threads['d']
+    assert ['a', 'b', 'c', 'd'] == list(state.representation['attributes'])
+
+
+@pytest.mark.asyncio
+async def test_sync_callback_in_default_executor():
+    test = Resource(
+        'test',
+        Attributes({
+            'foo': Integer,
+        }),
+    )
+    main_thread = threading.get_ident()
+
+    @test.attributes.foo.POST(executor=True)
+    def foo(state, var_collector):
+        assert main_thread != threading.get_ident()
+        # the state of request is visible in the executor.
+        var_collector.generated_resource_id = state.value
+
+    tp = PostSingleResourcePipelineRunner()
+    tp.prepare(test)
+
+    state = await tp.run(
+        raw_resource_id=None,
+        raw_attributes={'foo': 42},
+        raw_relationships={},
+    )
+    assert 42 == state.var_collector['generated_resource_id']
+
+
+def sum_of_squares(attr, state):
+    # state value and attr path are passed to the worker.
+    assert ('values',) == attr
+    return [os.getpid(), sum(value * value for value in state)]
+
+
+@pytest.mark.asyncio
+async def test_cpu_bound_callback_in_process():
+    test = Resource(
+        'test',
+        Attributes({
+            'values': Array(Integer),
+        }),
+    )
+
+    with pytest.raises(RuntimeError):
+        test.attributes.values.POST(cpu_bound=True)(lambda state: state)
+
+    with pytest.raises(RuntimeError):
+        @test.attributes.values.POST(cpu_bound=True)
+        async def not_sync(state):
+            pass
+
+    # bound to the pipeline of the request.
+    with pytest.raises(RuntimeError):
+        @test.attributes.values.POST(cpu_bound=True)
+        def with_var_collector(state, var_collector):
+            pass
+
+    with pytest.raises(RuntimeError):
+        @test.attributes.values.POST(cpu_bound=True)
+        def with_callback_kwargs(state, callback_kwargs):
+            pass
+
+    test.attributes.values.POST(cpu_bound=True)(sum_of_squares)
+
+    with ProcessPoolExecutor(2) as executor:
+        tp = PostSingleResourcePipelineRunner()
+        tp.set_process_executor(executor)
+        tp.prepare(test)
+
+        state = await tp.run(
+            raw_resource_id=None,
+            raw_attributes={'values': [1, 2, 3]},
+            raw_relationships={},
+        )
+
+    pid, ret = state.merged_output_of_callbacks.attributes['values']
+    assert os.getpid() != pid
+    assert 14 == ret
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from tests.utils.attr_config import *
@@ -5,6 +7,8 @@ from restpf.resource.definition import (
     Attributes,
     Resource,
 )
+from restpf.pipeline.codecs import create_codec
+from restpf.pipeline.etag import compute_etag_of_bytes
 from restpf.pipeline.single_resource.get import (
     GetSingleResourcePipelineRunner,
 )
@@ -54,3 +58,188 @@ async def test_simple_get():
         'relationships': {},
     }
     assert expected == pipeline.representation
+
+
+@pytest.mark.asyncio
+async def test_stream_get():
+    test = Resource(
+        'test',
+        Attributes({
+            'foo': Array(Integer),
+        }),
+        None,
+    )
+
+    @test.attributes.foo.GET
+    def get_foo(resource_id):
+        return range(resource_id)
+
+    tp = GetSingleResourcePipelineRunner()
+    tp.build_pipeline_state(raw_resource_id=42)
+    tp.build_context_rule()
+    tp.build_state_tree_builder()
+    tp.build_representation_generator(stream=True)
+    tp.set_resource(test)
+
+    pipeline = await tp.run_pipeline()
+
+    expected = {
+        'id': 42,
+        'type': 'test',
+        'attributes': {
+            'foo': {
+                'type': 'array',
+                'value': list(range(42)),
+                'element_type': 'integer',
+            },
+        },
+        'relationships': {},
+    }
+    assert expected == json.loads(''.join(pipeline.representation))
+
+
+@pytest.mark.asyncio
+async def test_conditional_get():
+    test = Resource(
+        'test',
+        Attributes({
+            'foo': Integer,
+        }),
+        None,
+    )
+    db = {'foo': 1}
+
+    @test.attributes.foo.GET
+    def get_foo(resource_id):
+        return db['foo']
+
+    tp = GetSingleResourcePipelineRunner()
+    tp.prepare(test)
+
+    state = await tp.run(raw_resource_id=1)
+    assert not state.not_modified
+    etag = state.etag
+
+    state = await tp.run(raw_resource_id=1, if_none_match=etag)
+    assert state.not_modified
+    assert state.representation is None
+
+    state = await tp.run(raw_resource_id=2, if_none_match=etag)
+    assert not state.not_modified
+
+    db['foo'] = 2
+    state = await tp.run(raw_resource_id=1, if_none_match=f'W/{etag}')
+    assert not state.not_modified
+    assert 2 == state.representation['attributes']['foo']['value']
+
+    # hashed from the bytes encoded by the codec.
+    tp = GetSingleResourcePipelineRunner()
+    tp.prepare(
+        test,
+        representation_generator_options={'codec': create_codec()},
+    )
+    state = await tp.run(raw_resource_id=1)
+    assert compute_etag_of_bytes(state.encoded_representation) == state.etag
+
+    state = await tp.run(raw_resource_id=1, if_none_match=state.etag)
+    assert state.not_modified
+    assert state.encoded_representation is None
+
+    # the body is not hashed in stream mode.
+    tp = GetSingleResourcePipelineRunner()
+    tp.prepare(test, representation_generator_options={'stream': True})
+    state = await tp.run(raw_resource_id=1, if_none_match='*')
+    assert state.etag is None
+    assert not state.not_modified
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_with_version():
+    test = Resource(
+        'test',
+        Attributes({
+            'foo': Integer,
+        }),
+        None,
+    )
+    db = {'foo': 1, 'version': 1}
+    called = []
+
+    @test.special_hooks.version.GET
+    def get_version(resource_id):
+        return db['version']
+
+    @test.attributes.foo.GET
+    def get_foo(resource_id):
+        called.append(get_foo)
+        return db['foo']
+
+    tp = GetSingleResourcePipelineRunner()
+    tp.prepare(test)
+
+    state = await tp.run(raw_resource_id=1)
+    assert [get_foo] == called
+    assert 1 == state.representation['attributes']['foo']['value']
+
+    # attribute callbacks are skipped.
+    state = await tp.run(raw_resource_id=1, if_none_match=state.etag)
+    assert state.not_modified
+    assert [get_foo] == called
+
+    db['version'] = 2
+    state = await tp.run(raw_resource_id=1, if_none_match=state.etag)
+    assert not state.not_modified
+    assert [get_foo, get_foo] == called
+
+    # same entity tag in stream mode.
+    stream_tp = GetSingleResourcePipelineRunner()
+    stream_tp.prepare(
+        test, representation_generator_options={'stream': True},
+    )
+    stream_state = await stream_tp.run(
+        raw_resource_id=1, if_none_match=state.etag,
+    )
+    assert stream_state.not_modified
+    assert state.etag == stream_state.etag
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_runs_before_all():
+    test = Resource(
+        'test',
+        Attributes({
+            'foo': Integer,
+        }),
+        None,
+    )
+    called = []
+
+    @test.special_hooks.before_all.GET
+    def check(resource_id):
+        called.append('before_all')
+        if resource_id == 2:
+            raise RuntimeError('forbidden')
+
+    @test.special_hooks.version.GET
+    def get_version(resource_id):
+        called.append('version')
+        return 1
+
+    @test.attributes.foo.GET
+    def get_foo(resource_id):
+        called.append('foo')
+        return 1
+
+    tp = GetSingleResourcePipelineRunner()
+    tp.prepare(test)
+
+    state = await tp.run(raw_resource_id=1, if_none_match='*')
+    assert state.not_modified
+    assert ['before_all', 'version'] == called
+
+    # the version is not checked before the access check.
+    for if_none_match in (state.etag, '*'):
+        called.clear()
+        with pytest.raises(RuntimeError):
+            await tp.run(raw_resource_id=2, if_none_match=if_none_match)
+        assert ['before_all'] == called
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from tests.utils.attr_config import *
+from restpf.resource.definition import (
+    Attributes,
+    Resource,
+)
+from restpf.resource.attribute_states import (
+    AttributeStateValidationError,
+)
+from restpf.pipeline.multiple_resource.get import (
+    GetMultipleResourcePipelineRunner,
+)
+
+
+def build_shared_resource():
+    return Resource(
+        'test',
+        Attributes({
+            'foo': Integer,
+            'bar': String,
+        }),
+        None,
+    )
+
+
+async def run_get(resource, raw_resource_ids, stream=False):
+    tp = GetMultipleResourcePipelineRunner()
+    tp.build_pipeline_state(raw_resource_ids=raw_resource_ids)
+    tp.build_context_rule()
+    tp.build_state_tree_builder()
+    tp.build_representation_generator(stream=stream)
+    tp.set_resource(resource)
+
+    return await tp.run_pipeline()
+
+
+@pytest.mark.asyncio
+async def test_multiple_get():
+    test = build_shared_resource()
+
+    called = []
+
+    @test.attributes.foo.GET
+    def get_foo(resource_ids):
+        called.append(list(resource_ids))
+        return {resource_id: resource_id * 10 for resource_id in resource_ids}
+
+    @test.attributes.bar.GET
+    async def get_bar(resource_id):
+        called.append(resource_id)
+        return str(resource_id)
+
+    pipeline = await run_get(test, [1, 2])
+
+    # batch callback is invoked once, others once per resource.
+    assert [[1, 2], 1, 2] == called
+
+    expected = [
+        {
+            'id': resource_id,
+            'type': 'test',
+            'attributes': {
+                'foo': {
+                    'type': 'integer',
+                    'value': resource_id * 10,
+                },
+                'bar': {
+                    'type': 'string',
+                    'value': str(resource_id),
+                }
+            },
+            'relationships': {},
+        }
+        for resource_id in [1, 2]
+    ]
+    assert expected == pipeline.representation
+
+    pipeline = await run_get(test, [1, 2], stream=True)
+    assert expected == json.loads(''.join(pipeline.representation))
+
+    # fragments are consumed after the request state is released.
+    tp = GetMultipleResourcePipelineRunner()
+    tp.prepare(test, representation_generator_options={'stream': True})
+    state = await tp.run(raw_resource_ids=[1, 2])
+    assert expected == json.loads(''.join(state.representation))
+
+
+@pytest.mark.asyncio
+async def test_multiple_get_sequence_output():
+    test = build_shared_resource()
+
+    @test.attributes.foo.GET
+    def get_foo(resource_ids):
+        return [resource_id + 1 for resource_id in resource_ids]
+
+    pipeline = await run_get(test, [1, 2, 3])
+    assert [2, 3, 4] == [
+        rep['attributes']['foo']['value']
+        for rep in pipeline.representation
+    ]
+
+    @test.attributes.foo.GET
+    def get_foo_not_matched(resource_ids):
+        return [1]
+
+    with pytest.raises(RuntimeError):
+        await run_get(test, [1, 2, 3])
+
+
+@pytest.mark.asyncio
+async def test_multiple_get_invalid_id():
+    test = build_shared_resource()
+
+    with pytest.raises(AttributeStateValidationError):
+        await run_get(test, [1, 'not an integer'])
@@ -47,3 +47,47 @@ async def test_simple_patch():
 
     await tp.run_pipeline()
     assert [foo] == called
+
+
+@pytest.mark.asyncio
+async def test_lazy_patch():
+    test = Resource(
+        'test',
+        Attributes({
+            'foo': Integer,
+            'doc': Object({
+                'bar': Array(Object({'baz': Integer})),
+            }),
+        }),
+    )
+    called = []
+
+    @test.attributes.foo.PATCH
+    def foo(state):
+        called.append(foo)
+        assert 1 == state.value
+
+    tp = PatchSingleResourcePipelineRunner()
+    tp.build_pipeline_state(
+        raw_resource_id=42,
+        raw_attributes={
+            'foo': 1,
+            'doc': {
+                'bar': [{'baz': idx} for idx in range(100)],
+            },
+        },
+        raw_relationships={},
+    )
+    tp.build_context_rule()
+    tp.build_state_tree_builder(lazy=True)
+    tp.build_representation_generator()
+    tp.set_resource(test)
+
+    pipeline = await tp.run_pipeline()
+    assert [foo] == called
+
+    # `doc` is never built.
+    attributes = pipeline.input_state.attributes
+    assert ['foo'] == list(
+        super(type(attributes), attributes).bh_named_children,
+    )
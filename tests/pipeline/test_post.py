@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 
 from tests.utils.attr_config import *
@@ -8,6 +10,9 @@ from restpf.resource.definition import (
 from restpf.pipeline.single_resource.post import (
     PostSingleResourcePipelineRunner,
 )
+from restpf.resource.attribute_states import (
+    AttributeStateValidationError,
+)
 
 
 def build_shared_resource():
@@ -75,3 +80,76 @@ async def test_simple_post():
     # no order required.
     assert ['a', 'c'] == called
     assert 999 == tp.pipeline_state.var_collector['generated_resource_id']
+
+
+@pytest.mark.asyncio
+async def test_post_invalid_payload():
+    test = build_shared_resource()
+
+    @test.attributes.foo.POST
+    def foo(state):
+        assert False
+
+    tp = PostSingleResourcePipelineRunner()
+    tp.build_pipeline_state(
+        raw_resource_id=None,
+        raw_attributes={
+            'foo': 'not an integer',
+            'a': {
+                'b': {
+                    'c': 1,
+                },
+                'd': 2,
+            }
+        },
+        raw_relationships={},
+    )
+    tp.build_context_rule()
+    tp.build_state_tree_builder()
+    tp.build_representation_generator()
+    tp.set_resource(test)
+
+    with pytest.raises(AttributeStateValidationError):
+        await tp.run_pipeline()
+
+
+@pytest.mark.asyncio
+async def test_prepared_post():
+    test = build_shared_resource()
+
+    @test.attributes.foo.POST(before_all=True)
+    async def foo(state, var_collector, callback_kwargs):
+        var_collector.generated_resource_id = state.value
+        callback_kwargs.register('registered', state.value)
+        # let the other requests run.
+        await asyncio.sleep(0)
+
+    @test.attributes.a.POST
+    async def a(generated_resource_id, registered, state):
+        assert generated_resource_id == registered
+        return state.d.value + generated_resource_id
+
+    tp = PostSingleResourcePipelineRunner()
+    tp.prepare(test)
+
+    states = await asyncio.gather(*(
+        tp.run(
+            raw_resource_id=None,
+            raw_attributes={
+                'foo': idx,
+                'a': {
+                    'b': {
+                        'c': 1,
+                    },
+                    'd': 2,
+                },
+            },
+            raw_relationships={},
+        )
+        for idx in range(10)
+    ))
+
+    for idx, state in enumerate(states):
+        assert idx == state.var_collector['generated_resource_id']
+        assert {'registered': idx} == state.registered_callback_kwargs
+        assert idx + 2 == state.merged_output_of_callbacks.attributes['a']
@@ -7,6 +7,7 @@ from restpf.utils.helper_functions import (
 )
 from restpf.utils.helper_classes import (
     TreeState,
+    ProxyStateOperator,
 )
 from restpf.resource.definition import (
     Attributes,
@@ -21,6 +22,9 @@ from restpf.pipeline.protocol import (
     _merge_output_of_callbacks,
     PipelineRunner,
 )
+from restpf.pipeline.single_resource.get import (
+    GetSingleResourcePipelineRunner,
+)
 
 
 @pytest.mark.asyncio
@@ -210,3 +214,38 @@ async def test_pipeline():
         },
     }
     assert expected == pipeline.representation
+
+
+@pytest.mark.asyncio
+async def test_update_only_callback_kwargs_controller():
+    # implements only `update`, without `lookup_kwarg`.
+    class UserController(ProxyStateOperator):
+
+        PROXY_ATTRS = ['raw_resource_id']
+
+        def update(self, ret):
+            ret['user'] = 'user-' + str(self.raw_resource_id)
+
+    class TestRunner(GetSingleResourcePipelineRunner):
+
+        CALLBACK_KWARGS_CONTROLLER_CLSES = [
+            *GetSingleResourcePipelineRunner.CALLBACK_KWARGS_CONTROLLER_CLSES,
+            UserController,
+        ]
+
+    test = Resource(
+        'test',
+        Attributes({
+            'foo': String,
+        }),
+    )
+
+    @test.attributes.foo.GET
+    def get_foo(resource_id, user):
+        assert 42 == resource_id
+        return user
+
+    tp = TestRunner()
+    tp.prepare(test)
+    state = await tp.run(raw_resource_id=42)
+    assert 'user-42' == state.representation['attributes']['foo']['value']
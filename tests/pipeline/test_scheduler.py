@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from tests.utils.attr_config import *
+from restpf.utils.constants import CallbackPriorityConfig
+from restpf.resource.definition import (
+    Attributes,
+    Resource,
+)
+from restpf.pipeline.scheduler import (
+    PriorityLimiter,
+    CallbackScheduler,
+)
+from restpf.pipeline.single_resource.get import (
+    GetSingleResourcePipelineRunner,
+)
+
+
+@pytest.mark.asyncio
+async def test_priority_limiter():
+    limiter = PriorityLimiter(1)
+    started = []
+
+    async def job(name, priority):
+        await limiter.acquire(priority)
+        started.append(name)
+        await asyncio.sleep(0)
+        limiter.release()
+
+    await limiter.acquire()
+    tasks = [
+        asyncio.ensure_future(job('low', 2)),
+        asyncio.ensure_future(job('high', 0)),
+        asyncio.ensure_future(job('normal', 1)),
+    ]
+    await asyncio.sleep(0)
+    assert 3 == limiter.waiting
+
+    limiter.release()
+    await asyncio.gather(*tasks)
+
+    assert ['high', 'normal', 'low'] == started
+    assert 0 == limiter.active
+
+    snapshot = limiter.snapshot()
+    assert 4 == snapshot['acquired']
+    assert 3 == snapshot['queued']
+
+
+def build_wide_resource(width, running, started):
+    test = Resource(
+        'test',
+        Attributes({
+            f'attr{idx}': Integer
+            for idx in range(width)
+        }),
+        None,
+    )
+
+    def register(idx):
+        priority = (
+            CallbackPriorityConfig.HIGH if idx == width - 1
+            else CallbackPriorityConfig.NORMAL
+        )
+
+        @getattr(test.attributes, f'attr{idx}').GET(priority=priority)
+        async def callback(resource_id):
+            started.append(idx)
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+            await asyncio.sleep(0.001)
+            running[0] -= 1
+            return idx
+
+    for idx in range(width):
+        register(idx)
+
+    return test
+
+
+@pytest.mark.asyncio
+async def test_scheduled_pipeline():
+    # [running, peak].
+    running = [0, 0]
+    started = []
+    test = build_wide_resource(10, running, started)
+
+    shared_limiter = PriorityLimiter(3)
+    scheduler = CallbackScheduler(limit=2, shared_limiter=shared_limiter)
+
+    tp = GetSingleResourcePipelineRunner()
+    tp.set_callback_scheduler(scheduler)
+    tp.prepare(test)
+
+    state = await tp.run(raw_resource_id=1)
+    assert 2 == running[1]
+    # the callback of high priority starts right after the first two.
+    assert 9 == started[2]
+    assert {
+        'type': 'integer',
+        'value': 9,
+    } == state.representation['attributes']['attr9']
+
+    # shared by concurrent requests.
+    running[1] = 0
+    await asyncio.gather(*(tp.run(raw_resource_id=1) for _ in range(3)))
+    assert 3 == running[1]
+    assert 3 == shared_limiter.snapshot()['peak_active']
+
+    snapshot = scheduler.snapshot()
+    assert 40 == snapshot['callbacks']['acquired']
+    assert snapshot['callbacks']['queued'] > 0
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from tests.utils.attr_config import *
+from restpf.resource.definition import (
+    Attributes,
+    Resource,
+)
+from restpf.pipeline.protocol import (
+    CallbackTimeoutError,
+)
+from restpf.pipeline.single_resource.get import (
+    GetSingleResourcePipelineRunner,
+)
+
+
+def build_shared_resource():
+    return Resource(
+        'test',
+        Attributes({
+            'foo': Integer,
+            'bar': Object({
+                'baz': Integer,
+            }),
+        }),
+        None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_callback_timeout():
+    test = build_shared_resource()
+    finished = []
+
+    @test.attributes.foo.GET(timeout=0.01)
+    async def foo():
+        await asyncio.sleep(1)
+
+    @test.attributes.bar.baz.GET
+    async def baz():
+        await asyncio.sleep(0.05)
+        finished.append(baz)
+
+    tp = GetSingleResourcePipelineRunner()
+    tp.prepare(test)
+
+    with pytest.raises(CallbackTimeoutError) as excinfo:
+        await tp.run(raw_resource_id=1)
+    assert ('attributes', 'foo') == excinfo.value.path
+    assert 'attributes.foo' in str(excinfo.value)
+
+    # the other callback of the group is cancelled.
+    await asyncio.sleep(0.1)
+    assert [] == finished
+
+
+@pytest.mark.asyncio
+async def test_request_deadline():
+    test = build_shared_resource()
+    called = []
+
+    @test.attributes.foo.GET(before_all=True)
+    async def foo():
+        called.append(foo)
+        await asyncio.sleep(0.03)
+
+    @test.attributes.bar.baz.GET(run_after=foo)
+    async def baz():
+        called.append(baz)
+        await asyncio.sleep(0.03)
+
+    tp = GetSingleResourcePipelineRunner()
+    tp.set_request_timeout(0.05)
+    tp.prepare(test)
+
+    with pytest.raises(CallbackTimeoutError) as excinfo:
+        await tp.run(raw_resource_id=1)
+    assert ('attributes', 'bar', 'baz') == excinfo.value.path
+    assert [foo, baz] == called
+
+    # passed deadline.
+    called.clear()
+    loop = asyncio.get_running_loop()
+    with pytest.raises(CallbackTimeoutError):
+        await tp.run(deadline=loop.time(), raw_resource_id=1)
+    assert [] == called
+
+    # no deadline.
+    tp.set_request_timeout(None)
+    await tp.run(raw_resource_id=1)
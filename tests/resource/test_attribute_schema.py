@@ -0,0 +1,102 @@
+import pytest
+
+from tests.utils.attr_config import *
+
+from restpf.resource.attribute_schema import (
+    compile_attribute_schema,
+)
+from restpf.resource.attribute_states import (
+    AttributeStateValidationError,
+)
+
+
+def test_compile_attribute_schema():
+    attr = Object({
+        'foo': Integer,
+        'bar': String(appear_in_post=AppearanceConfig.FREE),
+        'a': Object({
+            'b': Integer,
+        }),
+    })
+
+    schema = compile_attribute_schema(attr, HTTPMethodConfig.POST)
+
+    assert schema is compile_attribute_schema(attr, HTTPMethodConfig.POST)
+    assert schema.node is attr
+    assert schema.nodecls is Object
+    assert frozenset(['foo', 'a']) == schema.required_names
+    assert schema.ignore_unknown
+    assert not schema.nullable
+
+    a_schema = schema.named_children['a']
+    assert a_schema is compile_attribute_schema(
+        attr.bh_named_child('a'), HTTPMethodConfig.POST,
+    )
+    assert frozenset(['b']) == a_schema.required_names
+
+    schema = compile_attribute_schema(attr, HTTPMethodConfig.GET)
+    assert frozenset() == schema.required_names
+    assert not schema.ignore_unknown
+    assert schema.nullable
+
+
+def test_validate_schema():
+    attr = Object({
+        'foo': Integer,
+        'bar': Array(String),
+    })
+    schema = compile_attribute_schema(attr, HTTPMethodConfig.POST)
+
+    state = create_attribute_state_tree_for_input(attr, {
+        'foo': 42,
+        'bar': ['a', 'b'],
+    })
+    assert state.validate_schema(schema)
+
+    state = create_attribute_state_tree_for_input(attr, {
+        'foo': 42,
+        'bar': ['a', 1],
+    })
+    assert not state.validate_schema(schema)
+
+    state = create_attribute_state_tree_for_input(attr, {
+        'bar': ['a', 'b'],
+    })
+    assert not state.validate_schema(schema)
+
+
+def test_create_attribute_state_tree_with_schema():
+    attr = Object({
+        'foo': Integer,
+        'bar': Array(String),
+        'baz': Tuple(Integer, String),
+    })
+    schema = compile_attribute_schema(attr, HTTPMethodConfig.POST)
+
+    state = create_attribute_state_tree_for_input(
+        attr,
+        {
+            'foo': 42,
+            'bar': ['a', 'b'],
+            'baz': [1, 'c'],
+        },
+        schema,
+    )
+    assert state.validated_schema is schema
+    assert ['a', 'b'] == state.bar.value
+
+    with pytest.raises(AttributeStateValidationError) as excinfo:
+        create_attribute_state_tree_for_input(
+            attr,
+            {
+                'foo': 42,
+                'bar': ['a', 1],
+                'baz': [1, 'c'],
+            },
+            schema,
+        )
+    assert 'bar.element_attr' in str(excinfo.value)
+
+    # missing keys are rejected before building any element.
+    with pytest.raises(AttributeStateValidationError):
+        create_attribute_state_tree_for_input(attr, {'foo': 42}, schema)
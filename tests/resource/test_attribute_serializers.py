@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from tests.utils.attr_config import *
+
+from restpf.resource.attribute_states import (
+    AttributeStateValidationError,
+)
+from restpf.resource.attribute_serializers import (
+    compile_attribute_serializer,
+    compile_attribute_streamer,
+    STREAM_CHUNK_SIZE,
+)
+
+
+def assert_same_as_state_tree(attr, value, method=HTTPMethodConfig.GET):
+    state = create_attribute_state_tree_for_output(attr, value)
+    assert state.validate(AttributeContextOperator(method))
+
+    serializer = compile_attribute_serializer(attr, method)
+    assert state.serialize() == serializer(value)
+
+    streamer = compile_attribute_streamer(attr, method)
+    assert json.dumps(state.serialize()) == ''.join(streamer(value))
+
+
+def test_serializer():
+    attr = Object({
+        'foo': Integer,
+        'bar': String,
+        'a': Array(Float),
+        'b': Array(Object({'c': Bool})),
+        't1': Tuple(Integer, Integer),
+        't2': Tuple(Integer, String),
+    })
+
+    assert_same_as_state_tree(attr, {})
+    assert_same_as_state_tree(attr, {
+        'foo': 42,
+        'bar': None,
+        'a': [],
+    })
+    assert_same_as_state_tree(attr, {
+        'foo': 42,
+        'bar': 'test',
+        'a': [1.0, 2.0],
+        'b': [{'c': True}, {'c': False}],
+        't1': [1, 2],
+        't2': (1, 'test'),
+    })
+
+
+def test_serializer_validation():
+    attr = Object({
+        'foo': Integer,
+        'a': Array(Float),
+    })
+    serializer = compile_attribute_serializer(attr, HTTPMethodConfig.GET)
+
+    with pytest.raises(AttributeStateValidationError):
+        serializer({'foo': '42'})
+    with pytest.raises(AttributeStateValidationError):
+        serializer({'a': [1.0, 2]})
+    # unknown name is prohibited in GET.
+    with pytest.raises(AttributeStateValidationError):
+        serializer({'whatever': 42})
+
+    serializer = compile_attribute_serializer(attr, HTTPMethodConfig.POST)
+    with pytest.raises(AttributeStateValidationError):
+        serializer({'foo': 42})
+
+
+def test_streamer_large_array():
+    attr = Object({
+        'a': Array(Integer),
+    })
+    streamer = compile_attribute_streamer(attr, HTTPMethodConfig.GET)
+
+    values = list(range(STREAM_CHUNK_SIZE * 2 + 1))
+    fragments = list(streamer({'a': iter(values)}))
+    # elements are encoded chunk by chunk.
+    assert len(fragments) > 3
+    assert {
+        'a': {
+            'type': 'array',
+            'value': values,
+            'element_type': 'integer',
+        },
+    } == json.loads(''.join(fragments))
+
+    # validated while streaming.
+    fragments = streamer({'a': values + ['wrong']})
+    with pytest.raises(AttributeStateValidationError):
+        list(fragments)
+
+
+def test_streamer_non_finite_float():
+    attr = Object({
+        'foo': Float,
+        'a': Array(Float),
+    })
+    streamer = compile_attribute_streamer(attr, HTTPMethodConfig.GET)
+
+    text = ''.join(streamer({
+        'foo': float('inf'),
+        'a': [0.5, float('nan'), float('-inf')],
+    }))
+    # strict JSON.
+    representation = json.loads(
+        text, parse_constant=lambda name: pytest.fail(name),
+    )
+    assert representation['foo']['value'] is None
+    assert [0.5, None, None] == representation['a']['value']
@@ -1,6 +1,8 @@
 import pytest
 
 from tests.utils.attr_config import *
+from restpf.resource.attribute_schema import compile_attribute_schema
+from restpf.resource.attribute_states import AttributeStateValidationError
 
 
 class _TestContext:
@@ -399,3 +401,96 @@ def test_object_path():
 
     assert list(state.a.b.c.bh_path) == ['a', 'b', 'c']
     assert list(state.bh_path) == []
+
+
+def test_compact_leaf_state():
+    attr = Array(Integer)
+    state = gen_test_state_for_input(attr, [1, 2])
+
+    for element_state in state:
+        assert not hasattr(element_state, '__dict__')
+        assert 0 == element_state.bh_children_size
+        assert () == element_state.bh_children
+        assert {} == dict(element_state.bh_named_children)
+
+    assert list(state[0].bh_path) == ['element_attr']
+
+
+def test_packed_array_input():
+    attr = Array(Integer)
+    v = [1, 2, 3]
+    state = gen_test_state_for_input(attr, v)
+
+    # no element state before accessing the children.
+    assert state._packed_values is v
+    assert 3 == len(state)
+    assert v == state.value
+    assert state.validate(_TestContext.gen_attr_context())
+
+    assert 2 == state[1].value
+    assert state._packed_values is None
+    assert v == [element_state.value for element_state in state]
+
+    assert_not_validate_input(attr, [1, 2.0, 3])
+    assert_not_validate_input(Array(Float), [1.0, 2])
+    assert_validate_input(Array(String), ['a', 'b'])
+
+    # validated on construction.
+    schema = compile_attribute_schema(attr, HTTPMethodConfig.POST)
+    with pytest.raises(AttributeStateValidationError):
+        create_attribute_state_tree_for_input(attr, [1, '2'], schema)
+
+
+def test_packed_array_input_ndarray():
+    numpy = pytest.importorskip('numpy')
+
+    attr = Array(Integer)
+    state = gen_test_state_for_input(attr, numpy.arange(3))
+    assert state.validate(_TestContext.gen_attr_context())
+    assert [0, 1, 2] == state.value
+    assert 1 == state[1].value
+
+    assert_not_validate_input(attr, numpy.zeros(3))
+
+
+def test_lazy_object_input():
+    attr = Object({
+        'foo': Integer,
+        'a': Object({
+            'b': Integer,
+        }),
+    })
+    v = {'foo': 1, 'a': {'b': 2}, 'unknown': 3}
+    schema = compile_attribute_schema(attr, HTTPMethodConfig.POST)
+
+    state = create_attribute_state_tree_for_input(attr, v, schema, lazy=True)
+    assert 3 == state.bh_children_size
+    assert 2 == state.a.b.value
+    # built in the order of the mapping.
+    assert v == state.value
+    assert ['foo', 'a', 'unknown'] == list(state.bh_named_children)
+
+    # invalid element is detected on being reached.
+    state = create_attribute_state_tree_for_input(
+        attr, {'foo': 1, 'a': {'b': '2'}}, schema, lazy=True,
+    )
+    assert 1 == state.foo.value
+    with pytest.raises(AttributeStateValidationError):
+        state.a.b
+
+    # names are checked on construction.
+    with pytest.raises(AttributeStateValidationError):
+        create_attribute_state_tree_for_input(
+            attr, {'a': {'b': 2}}, schema, lazy=True,
+        )
+
+    # falsy element built before is not rebuilt.
+    attr = Object({
+        'a': Array(Integer),
+        'b': Integer,
+    })
+    state = create_attribute_state_tree_for_input(
+        attr, {'a': [], 'b': 1}, lazy=True,
+    )
+    child = state.bh_named_child('a')
+    assert child is state.bh_named_children['a']
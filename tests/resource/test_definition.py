@@ -114,3 +114,67 @@ def test_validate_on_empty_relationships():
         {},
     )
     assert obj.validate(context)
+
+
+def test_attribute_path():
+    rd = Resource(
+        'test',
+        Attributes({
+            'foo': String,
+            'a': Object({
+                'b': Object({
+                    'bar': String,
+                }),
+            }),
+        }),
+        None,
+    )
+    attr_obj = rd.attributes_obj.attr_obj
+    bar = attr_obj.bh_named_child('a').bh_named_child('b')
+    bar = bar.bh_named_child('bar')
+
+    assert () == attr_obj.path
+    assert ('a', 'b', 'bar') == bar.path
+    assert bar.path is bar.path
+    assert () == rd.id_obj.path
+
+    @rd.attributes.a.b.bar.GET
+    def get_bar():
+        pass
+
+    callback, _ = rd.attributes_obj.get_registered_callback_and_options(
+        bar.path, HTTPMethodConfig.GET,
+    )
+    assert get_bar is callback
+
+
+def test_callback_plan():
+    rd = Resource(
+        'test',
+        Attributes({
+            'foo': String,
+            'bar': String,
+        }),
+        None,
+    )
+
+    @rd.attributes.foo.GET
+    def get_foo():
+        pass
+
+    plan = rd.callback_plan(HTTPMethodConfig.GET)
+    assert plan is rd.callback_plan(HTTPMethodConfig.GET)
+    assert [[get_foo]] == plan.parallel_groups
+
+    @rd.attributes.bar.GET(run_after=get_foo)
+    def get_bar():
+        pass
+
+    plan = rd.callback_plan(HTTPMethodConfig.GET)
+    assert [[get_foo], [get_bar]] == plan.parallel_groups
+
+    collections = dict(plan.collections)
+    assert [get_foo, get_bar] == [
+        callback for _, callback, _ in collections['attributes']
+    ]
+    assert [] == collections['special_hooks']
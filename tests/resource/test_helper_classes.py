@@ -30,6 +30,12 @@ def test_context_operator():
     context = TestCO('post')
     assert 2 == context.name(ins)
 
+    # generated once per context.
+    assert context is TestCO('post')
+    assert 'post' == context.context
+    assert isinstance(context, TestCO)
+    assert 'name' in type(context).__dict__
+
 
 def test_tree_state():
     ts = TreeState()
@@ -68,6 +74,12 @@ def test_proxy_state_operator():
     t.bind_proxy_state(state)
     assert set(['a', 'b', 'c', 'd']) == set(t.PROXY_ATTRS.keys())
 
+    # non-proxied attributes are not forwarded.
+    t.e = 42
+    assert 42 == t.e
+    assert not hasattr(state, 'e')
+    assert 'e' in t.__dict__
+
     class TestDefault(ProxyStateOperator):
 
         PROXY_ATTRS = [
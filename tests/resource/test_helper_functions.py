@@ -2,6 +2,7 @@ import pytest
 
 from restpf.utils.helper_functions import (
     async_call,
+    compile_callback_invoker,
     bind_self_with_options,
     method_named_args,
     parallel_groups_of_callbacks,
@@ -156,3 +157,31 @@ def testparallel_groups_of_callbacks():
     assert 2 == len(groups)
     assert set([a, b, c]) == set(groups[0])
     assert set([d]) == set(groups[1])
+
+
+@pytest.mark.asyncio
+async def test_callback_invoker():
+
+    async def func(a, b=1):
+        return a + b
+
+    invoker = compile_callback_invoker(func)
+    assert invoker is compile_callback_invoker(func)
+    assert invoker.is_coroutine
+    assert ('a', 'b') == invoker.params
+
+    class LazySource(dict):
+
+        def __init__(self):
+            self.looked_up = []
+
+        def get(self, name, default=None):
+            self.looked_up.append(name)
+            return {'a': 1, 'c': 3}.get(name, default)
+
+    source = LazySource()
+    assert 2 == await invoker.invoke(func, source)
+    assert ['a', 'b'] == source.looked_up
+
+    with pytest.raises(RuntimeError):
+        await invoker.invoke(func, {'b': 2})
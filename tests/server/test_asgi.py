@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from tests.utils.attr_config import *
+from restpf.resource.definition import (
+    Attributes,
+    Resource,
+)
+from restpf.server.asgi import (
+    ASGIApplication,
+    ASGITestClient,
+)
+
+
+def build_client():
+    test = Resource(
+        'test',
+        Attributes({
+            'foo': Array(Integer),
+        }),
+    )
+    store = {}
+
+    @test.attributes.POST
+    def post(raw_attributes, var_collector):
+        store[1] = raw_attributes['foo']
+        var_collector.generated_resource_id = 1
+
+    @test.attributes.GET
+    def get(resource_id):
+        return {'foo': store[resource_id]}
+
+    app = ASGIApplication([test], prefix='/api/')
+    # force the body to be streamed in many chunks.
+    return ASGITestClient(app, chunk_size=16), store
+
+
+@pytest.mark.asyncio
+async def test_asgi_round_trip():
+    client, store = build_client()
+
+    response = await client.request(
+        'POST', '/api/test',
+        {'data': {'type': 'test', 'attributes': {'foo': list(range(10))}}},
+    )
+    assert 201 == response.status
+    assert 'application/vnd.api+json' == response.headers['content-type']
+    assert {'type': 'test', 'id': 1} == json.loads(response.body)['data']
+    assert {1: list(range(10))} == store
+
+    response = await client.request('GET', '/api/test/1')
+    assert 200 == response.status
+    assert 1 == json.loads(response.body)['data']['id']
+    etag = response.headers['etag']
+
+    response = await client.request(
+        'GET', '/api/test/1', headers={'If-None-Match': etag},
+    )
+    assert 304 == response.status
+    assert b'' == response.body
+
+    assert 404 == (await client.request('GET', '/other/test/1')).status
+    assert 404 == (await client.request('GET', '/api/test/1/foo')).status
+    assert 404 == (await client.request('GET', '/api/unknown/1')).status
+
+
+@pytest.mark.asyncio
+async def test_asgi_malformed_body():
+    client, store = build_client()
+
+    for attributes in (
+        # not an object.
+        [1],
+        # not an array.
+        {'foo': 1},
+        {'foo': {'bar': 1}},
+    ):
+        response = await client.request(
+            'POST', '/api/test',
+            {'data': {'type': 'test', 'attributes': attributes}},
+        )
+        assert 400 == response.status
+        assert '400' == json.loads(response.body)['errors'][0]['status']
+
+    assert {} == store
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from tests.utils.attr_config import *
+from restpf.resource.definition import (
+    Attributes,
+    Resource,
+)
+from restpf.server.dispatch import ResourceDispatcher
+
+
+def build_dispatcher():
+    test = Resource(
+        'test',
+        Attributes({
+            'foo': Integer,
+        }),
+    )
+    store = {}
+
+    @test.attributes.POST
+    def post(raw_attributes, var_collector):
+        resource_id = len(store) + 1
+        store[resource_id] = raw_attributes['foo']
+        var_collector.generated_resource_id = resource_id
+
+    @test.attributes.GET
+    def get(resource_id):
+        return {'foo': store[resource_id]}
+
+    @test.attributes.foo.PATCH
+    def patch(resource_id, state):
+        store[resource_id] = state.value
+
+    @test.attributes.DELETE
+    def delete(resource_id):
+        del store[resource_id]
+
+    dispatcher = ResourceDispatcher()
+    dispatcher.add_resource(test)
+    return dispatcher, store
+
+
+def document(**attributes):
+    return json.dumps({
+        'data': {
+            'type': 'test',
+            'attributes': attributes,
+        },
+    }).encode()
+
+
+@pytest.mark.asyncio
+async def test_dispatch_round_trip():
+    dispatcher, store = build_dispatcher()
+
+    response = await dispatcher.dispatch('POST', 'test', body=document(foo=1))
+    assert 201 == response.status
+    assert {'type': 'test', 'id': 1} == json.loads(response.body)['data']
+
+    response = await dispatcher.dispatch('GET', 'test', '1')
+    assert 200 == response.status
+    attributes = json.loads(response.body)['data']['attributes']
+    assert 1 == attributes['foo']['value']
+    etag = response.headers['etag']
+
+    response = await dispatcher.dispatch(
+        'GET', 'test', '1', headers={'if-none-match': etag},
+    )
+    assert 304 == response.status
+    assert b'' == response.body
+
+    response = await dispatcher.dispatch(
+        'PATCH', 'test', '1', body=document(foo=2),
+    )
+    assert 204 == response.status
+    assert {1: 2} == store
+
+    response = await dispatcher.dispatch('DELETE', 'test', '1')
+    assert 204 == response.status
+    assert {} == store
+
+
+@pytest.mark.asyncio
+async def test_dispatch_errors():
+    dispatcher, _ = build_dispatcher()
+
+    response = await dispatcher.dispatch('GET', 'unknown', '1')
+    assert 404 == response.status
+    assert '404' == json.loads(response.body)['errors'][0]['status']
+
+    assert 405 == (await dispatcher.dispatch('PUT', 'test', '1')).status
+    assert 405 == (await dispatcher.dispatch('GET', 'test')).status
+    assert 404 == (await dispatcher.dispatch('GET', 'test', 'abc')).status
+
+    response = await dispatcher.dispatch('POST', 'test', body=b'{')
+    assert 400 == response.status
+    response = await dispatcher.dispatch('POST', 'test', body=b'{}')
+    assert 400 == response.status
+    response = await dispatcher.dispatch(
+        'POST', 'test', body=document(foo='1'),
+    )
+    assert 400 == response.status
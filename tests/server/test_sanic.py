@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from tests.utils.attr_config import *
+from restpf.resource.definition import (
+    Attributes,
+    Resource,
+)
+
+sanic = pytest.importorskip('sanic')
+pytest.importorskip('sanic_testing')
+
+from restpf.server.sanic import mount  # noqa: E402
+
+
+def build_app():
+    test = Resource(
+        'test',
+        Attributes({
+            'foo': Integer,
+        }),
+    )
+    store = {}
+
+    @test.attributes.POST
+    def post(raw_attributes, var_collector):
+        store[1] = raw_attributes['foo']
+        var_collector.generated_resource_id = 1
+
+    @test.attributes.GET
+    def get(resource_id):
+        return {'foo': store[resource_id]}
+
+    @test.attributes.DELETE
+    def delete(resource_id):
+        del store[resource_id]
+
+    app = sanic.Sanic('test_restpf_sanic')
+    mount(app, [test], prefix='/api')
+    return app, store
+
+
+@pytest.mark.asyncio
+async def test_sanic_round_trip():
+    app, store = build_app()
+    client = app.asgi_client
+
+    _, response = await client.post(
+        '/api/test',
+        content=json.dumps(
+            {'data': {'type': 'test', 'attributes': {'foo': 1}}},
+        ),
+    )
+    assert 201 == response.status
+    assert 'application/vnd.api+json' == response.headers['content-type']
+    assert {'type': 'test', 'id': 1} == response.json['data']
+    assert {1: 1} == store
+
+    _, response = await client.get('/api/test/1')
+    assert 200 == response.status
+    assert 1 == response.json['data']['attributes']['foo']['value']
+    etag = response.headers['etag']
+
+    _, response = await client.get(
+        '/api/test/1', headers={'If-None-Match': etag},
+    )
+    assert 304 == response.status
+
+    _, response = await client.get('/api/unknown/1')
+    assert 404 == response.status
+
+    _, response = await client.delete('/api/test/1')
+    assert 204 == response.status
+    assert {} == store